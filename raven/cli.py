@@ -118,6 +118,18 @@ def stop():
     run_process_action(action='stop')
 
 
+@cli.command()
+@click.argument('broker', type=click.Path())
+@click.option('--max-jobs', metavar='INT', type=int, default=None, help='number of jobs to execute before exiting.')
+@click.option('--timeout', metavar='SECONDS', type=float, default=None,
+              help='exit after waiting this long for a new job.')
+def worker(broker, max_jobs, timeout):
+    """Execute the Raven runs queued in a BROKER directory by QueueExecutor."""
+    from raven.models import QueueWorker
+    n = QueueWorker(broker).run(max_jobs=max_jobs, timeout=timeout)
+    click.echo("{} jobs executed".format(n))
+
+
 @cli.command()
 @click.option('--config', '-c', metavar='PATH', help='path to pywps configuration file.')
 @click.option('--bind-host', '-b', metavar='IP-ADDRESS', default='127.0.0.1',
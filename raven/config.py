@@ -1 +1,8 @@
+import shutil
+from pathlib import Path
+
 max_parallel_processes = 100
+
+# Parallel calibration algorithms (ParallelDDS) are only offered if Ostrich was built with MPI
+# (make ostrich_dev OSTRICH_TARGET=MPI), which leaves a marker next to the executable, and an MPI launcher is found.
+ostrich_mpi = (Path(__file__).parent.parent / 'bin' / 'ostrich.mpi').exists() and shutil.which('mpirun') is not None
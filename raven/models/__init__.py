@@ -1,6 +1,10 @@
 from .gr4j_cemaneige import simulation as gr4j
 import os
 from .base import Raven, Ostrich
+from .cache import ResultCache
+from .calibration import EarlyStopping
+from .executors import LocalExecutor, PoolExecutor, QueueExecutor, QueueWorker
+from .state import StateStore
 from .emulators import GR4JCN, MOHYSE, HMETS, HBVEC, get_model
 from .emulators import GR4JCN_OST, MOHYSE_OST, HMETS_OST, HBVEC_OST
 from .multimodel import RavenMultiModel
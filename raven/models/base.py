@@ -23,12 +23,24 @@ import subprocess
 import tempfile
 import csv
 import datetime as dt
+import hashlib
+import re
+import threading
+import warnings
+from contextlib import contextmanager
 import six
 import xarray as xr
 from .rv import RVFile, RV, RVI, isinstance_namedtuple, Ost
+from .forcing import forcing_metadata, subset_forcing
+from .timing import Timings, disk_usage
+from .executors import LocalExecutor
 import numpy as np
 import shutil
 
+# Serializes the configuration of models driven concurrently by `arun`, since models of the same class share their rv
+# objects.
+_configure_lock = threading.Lock()
+
 
 class Raven:
     """RAVEN hydrological model wrapper
@@ -65,6 +77,13 @@ class Raven:
                        'evspsbl': ['pet', 'evap', 'evapotranspiration'],
                        'water_volume_transport_in_river_channel': ['qobs', 'discharge', 'streamflow']
                        }
+    # File storing the standard output and error of the executable, in the directory where it is launched.
+    _log_name = 'stdout.log'
+
+    # Outputs collected after a run.
+    _output_keys = ('hydrograph', 'storage', 'solution', 'diagnostics', 'rvconfig')
+    _diagnostics_table_name = 'diagnostics_table.csv'
+
     _parallel_parameters = ['params', 'nc_index', 'name', 'area', 'elevation', 'latitude', 'longitude', 'region_id',
                             'hrus']
 
@@ -86,7 +105,26 @@ class Raven:
         self.workdir = Path(workdir)
         self.ind_outputs = {}  # Individual files for all simulations
         self.outputs = {}  # Aggregated files
+        self.selected_outputs = self._output_keys  # Outputs collected by parse_results
+        self._datasets = {}  # Opened output datasets
+        self._diagnostics = None  # Table of the diagnostics of all runs
         self.singularity = False  # Set to True to launch Raven with singularity.
+        self.cache = None  # ResultCache instance used to reuse the outputs of identical runs.
+        self.state_store = None  # StateStore instance used to restart simulations from their last saved state.
+        self._initial_state = None
+        self._state_keys = {}
+        self.max_workers = os.cpu_count()  # Maximum number of Raven processes running simultaneously.
+        self.executor = LocalExecutor()  # Backend launching the executable (see `executors`).
+        self.batch_basins = False  # Set to True to simulate multiple basins (nc_index) in a single Raven process.
+        self.forcing_cache = None  # Directory storing forcing files subset to the simulation window and basin.
+        self.reuse_workspace = False  # Set to True to keep the model directories between calls.
+        self._workspace_now = None
+        self._signatures = {}  # Values of the tags used to render each configuration file.
+        self.scratch = None  # Directory on a RAM-backed file system (e.g. /dev/shm) where the model is run.
+        self.persist_outputs = ('hydrograph', 'storage', 'solution', 'diagnostics', 'rvconfig')  # Kept from scratch.
+        self.run_order = []  # Parallel run indices (psim), in the order the runs completed.
+        self.timings = Timings()  # Duration of each phase of the last call.
+        self.timing_callback = None  # Function called with the name and value of each timing entry.
         self.raven_exec = raven.raven_exec
         self.raven_simg = raven.raven_simg
         self.ostrich_exec = raven.ostrich_exec
@@ -97,9 +135,10 @@ class Raven:
         # Configuration file extensions + rvd for derived parameters.
         self._rvext = self._rvext + ('rvd', )
 
-        # For subclasses where the configuration file templates are known in advance.
+        # For subclasses where the configuration file templates are known in advance. Templates are read once and
+        # shared by all instances.
         if self.templates:
-            self.configure(self.templates)
+            self.configure(self.templates, cached=True)
 
         # Directory logic
         # Top directory inside workdir. This is where Ostrich and its config and templates are stored.
@@ -194,8 +233,8 @@ class Raven:
     def parameters(self):
         """Dictionary storing all parameters."""
         params = {}
-        for key, val in self.configuration.items():
-            params.update(val)
+        for ext in self._rvext:
+            params.update(getattr(self, ext).items())
         return params
 
     @property
@@ -203,10 +242,18 @@ class Raven:
         """Generator for (ext, rv object)."""
         return {ext: getattr(self, ext) for ext in self._rvext}
 
-    def configure(self, fns):
-        """Read configuration files."""
+    def configure(self, fns, cached=False):
+        """Read configuration files.
+
+        Parameters
+        ----------
+        fns : sequence
+          Paths to the configuration files or templates.
+        cached : bool
+          If True, reuse the files already read by other instances (see `RVFile.cached`).
+        """
         for fn in fns:
-            rvf = RVFile(fn)
+            rvf = RVFile.cached(fn) if cached else RVFile(fn)
             if rvf.ext not in self._rvext + ('txt',):
                 raise ValueError('rv contains unrecognized configuration file keys : {}.'.format(rvf.ext))
             else:
@@ -237,14 +284,32 @@ class Raven:
         return
 
     def _dump_rv(self):
-        """Write configuration files to disk."""
+        """Write configuration files to disk.
+
+        Templates are only rendered again if the values of the tags they use changed since they were last written, and
+        files whose content did not change are left untouched.
+        """
         params = self.parameters
 
+        if self.reuse_workspace and 'now' in params:
+            # Keep the creation time of the workspace, so that unchanged files are not rewritten.
+            self._workspace_now = self._workspace_now or params['now']
+            params['now'] = self._workspace_now
+
         for rvf in self.rvfiles:
             p = self.exec_path if rvf.is_tpl else self.model_path
             if rvf.stem == 'OstRandomNumbers' and isinstance(self.txt, Ost) and self.txt.random_seed == "":
                 continue
-            fn = rvf.write(p, **params)
+            fn = p / rvf.fn.name
+            if rvf.ext == 'rvc' and not rvf.is_tpl and self._initial_state is not None:
+                # Restart from the end state of the previous simulation.
+                shutil.copy(str(self._initial_state.solution), str(fn))
+                self._signatures.pop(fn, None)
+            else:
+                signature = rvf.signature(params)
+                if self._signatures.get(fn) != signature or not fn.exists():
+                    _write_changed(fn, rvf.render(**params))
+                    self._signatures[fn] = signature
             self._createdrvs.append(fn)
 
     def setup(self, overwrite=False):
@@ -256,7 +321,21 @@ class Raven:
            model/
            output/
 
+        If `reuse_workspace` is True and `overwrite` is True, an existing workspace is kept: only the outputs of the
+        previous call are deleted, while configuration files and symbolic links are reused by the next runs.
         """
+        # Release output files before they get deleted.
+        self.close()
+
+        self.exec_path = self._exec_path()
+
+        if self.reuse_workspace and overwrite and self.exec_path.exists():
+            self._clean_outputs()
+            os.makedirs(str(self.final_path), exist_ok=True)
+            return
+
+        self._workspace_now = None
+
         if self.exec_path.exists():
             if overwrite:
                 shutil.rmtree(str(self.exec_path))
@@ -275,6 +354,83 @@ class Raven:
         os.makedirs(str(self.exec_path))    # workdir/exec
         os.makedirs(str(self.final_path))  # workdir/final
 
+    def _exec_path(self):
+        """Return the directory where the model is run.
+
+        If `scratch` is set, the model is run in a subdirectory of `scratch` specific to the working directory, and only
+        the outputs listed in `persist_outputs` are copied to `final_path` once the results are parsed.
+        """
+        if self.scratch is None:
+            return self.workdir / 'exec'
+
+        uid = hashlib.sha1(str(self.workdir.resolve()).encode('utf-8')).hexdigest()[:12]
+        return Path(self.scratch).absolute() / 'raven-{}'.format(uid) / 'exec'
+
+    def _persist(self):
+        """Copy the outputs listed in `persist_outputs` from the scratch directory to `final_path`, then delete the
+        scratch directory (unless `reuse_workspace` is True).
+
+        Outputs that were merged are already stored in `final_path`. Individual run files are only copied when their
+        outputs could not be merged.
+        """
+        if self.scratch is None or Path(self.scratch).absolute() not in self.exec_path.parents:
+            return
+
+        def copy(fn):
+            dst = self.final_path / Path(fn).relative_to(self.exec_path)
+            os.makedirs(str(dst.parent), exist_ok=True)
+            shutil.copy(str(fn), str(dst))
+            return dst
+
+        for key in list(self.outputs):
+            out = self.outputs[key]
+            if key not in self.persist_outputs:
+                if key in self.ind_outputs or key == 'rvconfig':
+                    if isinstance(out, Path) and self.final_path in out.parents:
+                        out.unlink()
+                    self.outputs.pop(key)
+                    self.ind_outputs.pop(key, None)
+                continue
+
+            if not isinstance(out, Path):
+                continue
+
+            if self.exec_path in out.parents:
+                self.outputs[key] = copy(out)
+                if key in self.ind_outputs:
+                    self.ind_outputs[key] = [self.outputs[key], ]
+            elif key in self.ind_outputs:
+                if out.suffix == '.zip':
+                    self.ind_outputs[key] = [copy(fn) for fn in self.ind_outputs[key]]
+                else:
+                    self.ind_outputs[key] = []
+
+        if not self.reuse_workspace:
+            shutil.rmtree(str(self.exec_path.parent), ignore_errors=True)
+
+    def _clean_outputs(self):
+        """Delete the output files of the previous call, keeping the model configuration."""
+        paths = [p for p in self.exec_path.rglob(self.output_dir) if p.is_dir()]
+        if self.final_path.exists():
+            paths.append(self.final_path)
+
+        for path in paths:
+            for fn in path.iterdir():
+                if fn.is_dir() and not fn.is_symlink():
+                    shutil.rmtree(str(fn))
+                else:
+                    fn.unlink()
+
+    def _remove_stale_runs(self, nloops):
+        """Delete the directories of parallel runs with an index larger than the number of runs."""
+        if not self.model_path.parent.exists():  # New workspace.
+            return
+
+        for path in self.model_path.parent.iterdir():
+            match = re.fullmatch(r'p(\d+)', path.name)
+            if match and int(match.group(1)) >= nloops:
+                shutil.rmtree(str(path))
+
     def setup_model_run(self, ts):
         """Create directory structure to store model input files, executable and output results.
 
@@ -286,27 +442,106 @@ class Raven:
           Run index.
         """
         # Match the input files
-        files, var_names, dimensions = self._assign_files(ts)
-        self.rvt.update(files, force=True)
-        self.rvt.update(var_names, force=True)
-        if dimensions:
-            self.rvt.update({'nc_dimensions': dimensions}, force=True)
+        forcing = self._update_forcing(ts)
 
         # Compute derived parameters
-        self.derived_parameters()
+        with self.timings.phase('derived_parameters'):
+            self.derived_parameters()
 
         # Write configuration files in model directory
         if not self.model_path.exists():
             os.makedirs(self.model_path)
             os.makedirs(self.output_path)
-        self._dump_rv()
+        with self._forcing_subsets(*forcing), self.timings.phase('dump_rv'):
+            self._dump_rv()
+
+        with self.timings.phase('link'):
+            return self._link_inputs(ts)
 
+    def _update_forcing(self, ts):
+        """Set the forcing file names, variable names and dimensions in the rvt configuration.
+
+        Returns
+        -------
+        files : dict
+          Forcing file storing each variable.
+        var_names : dict
+          Name of each variable within its netCDF file, keyed by `<variable>_var`.
+        """
+        with self.timings.phase('assign_files'):
+            files, var_names, dimensions = self._assign_files(ts)
+        self.rvt.update(files, force=True)
+        self.rvt.update(var_names, force=True)
+        if dimensions:
+            self.rvt.update({'nc_dimensions': dimensions}, force=True)
+        return files, var_names
+
+    @contextmanager
+    def _forcing_subsets(self, files, var_names, by_station=True):
+        """Context manager replacing the forcing files in the rvt configuration by subsets stored in `forcing_cache`.
+
+        Subsets only hold the simulation window and, if `by_station` is True, the station selected by `nc_index`, whose
+        index then becomes 0. Does nothing if `forcing_cache` is None. The original files and station index are restored
+        on exit, so that derived parameters are always computed from the complete forcing files.
+        """
+        if self.forcing_cache is None:
+            yield
+            return
+
+        index = getattr(self.rvt, '_nc_index', None)
+        try:
+            with self.timings.phase('subset_forcing'):
+                self.rvt.update(self._subset_forcing(files, var_names, by_station), force=True)
+            yield
+        finally:
+            self.rvt.update(files, force=True)
+            if index is not None:
+                self.rvt.nc_index = index
+
+    def _subset_forcing(self, files, var_names, by_station=True):
+        """Return the forcing files of each variable, subset to the simulation window and station of the current run.
+
+        Parameters
+        ----------
+        files : dict
+          Forcing file storing each variable, as returned by `_assign_files`.
+        var_names : dict
+          Name of each variable within its netCDF file, keyed by `<variable>_var`.
+        by_station : bool
+          If True, only the station selected by `nc_index` is kept.
+        """
+        rvi = self.rvi
+        start = getattr(rvi, 'start_date', None)
+        end = getattr(rvi, 'end_date', None)
+        if start is None or end is None or start == dt.datetime(1, 1, 1):
+            start = end = None
+
+        index = getattr(self.rvt, '_nc_index', None) if by_station else None
+
+        # Variables stored in the same file are extracted together.
+        variables = defaultdict(list)
+        for var, fn in files.items():
+            variables[fn].append(var_names[var + '_var'])
+
+        path = Path(self.forcing_cache).absolute()
+        subsets = {fn: subset_forcing(fn, names, path, start, end, index)
+                   for (fn, names) in variables.items()}
+
+        # Station time series now hold a single station.
+        stations = [len(forcing_metadata(fn).dims[names[0]]) == 2 for (fn, names) in variables.items()]
+        if index is not None and any(stations):
+            self.rvt.nc_index = 0
+
+        return {var: subsets[fn] for (var, fn) in files.items()}
+
+    def _link_inputs(self, ts):
+        """Create symbolic links to the input files and executable in the model directory and return the command."""
         # Create symbolic link to input files
         for fn in ts:
-            os.symlink(str(fn), str(self.model_path / Path(fn).name))
+            _symlink(fn, self.model_path / Path(fn).name)
 
         # Create symbolic link to Raven executable
-        os.symlink(self.raven_exec, str(self.raven_cmd))
+        _symlink(self.raven_exec, self.raven_cmd)
 
         # Shell command to run the model
         if self.singularity:
@@ -332,16 +567,34 @@ class Raven:
         launch the Raven executable. If the configuration files are templates, values can be formatted by passing
         dictionaries keyed by their extension.
 
+        Parallel runs (multiple `params` or `nc_index`) are queued and executed with at most `max_workers` processes
+        running simultaneously. This call blocks until all runs have completed.
+
+        Returns
+        -------
+        list
+          Completed processes, in the order they finished.
+
         Example
         -------
         >>> r = Raven()
         >>> r.configure(rvi='path to template', rvp='...'}
         >>> r.run(ts, start_date=dt.datetime(2000, 1, 1), area=1000, X1=67)
 
+        """
+        return self._launch(self._prepare_runs(ts, **kwds))
+
+    def _prepare_runs(self, ts, **kwds):
+        """Write the configuration of each parallel run and return the list of runs to execute.
+
+        Each run is described by a (psim, command, cwd, done) tuple, where `done` is None or a function called with the
+        completed process. Runs whose outputs could be restored from the result cache are not returned.
         """
         if isinstance(ts, (six.string_types, Path)):
             ts = [ts, ]
 
+        self._createdrvs = []
+
         # Case for potentially parallel parameters
         pdict = {}
         for p in self._parallel_parameters:
@@ -385,29 +638,392 @@ class Raven:
         if self.rvi:
             self.handle_date_defaults(ts)
 
+        if self.batch_basins and self._pdim == 'nbasins' and self.state_store is None:
+            if self._batchable(pdict):
+                if self.reuse_workspace:
+                    self._remove_stale_runs(1)
+                return self._prepare_batched_run(ts, pdict, nloops)
+            warnings.warn("Basins can only be simulated in a single process if they share the same model "
+                          "parameters. Running one process per basin instead.")
+
+        if self.reuse_workspace:
+            self._remove_stale_runs(nloops)
+
         # Loop over parallel parameters
-        procs = []
+        jobs = []
+        self._initial_state = None
+        self._state_keys = {}
         for self.psim in range(nloops):
             for key, val in pdict.items():
                 if val[self.psim] is not None:
                     self.assign(key, val[self.psim])
 
+            if self.state_store is not None:
+                self._warm_start()
+
             cmd = self.setup_model_run(tuple(map(Path, ts)))
-            procs.append(subprocess.Popen(cmd, cwd=self.cmd_path, stdout=subprocess.PIPE))
+
+            done = None
+            key = self._cache_key(ts)
+            if key is not None:
+                if self.cache.restore(key, self.output_path):
+                    continue
+                done = self._cache_store(key, self.output_path)
+
+            jobs.append((self.psim, cmd, self.cmd_path, done))
+
+        return jobs
+
+    def _warm_start(self):
+        """Set the initial state and start date of the current run from the state store.
+
+        If a state was saved for the current basin and parameter set, the simulation starts on the last simulated
+        day, from the saved end state.
+        """
+        params = self.parameters
+        key = self.state_store.key(self.identifier, *(params.get(p) for p in self._parallel_parameters))
+        state = self.state_store.get(key)
+        self._state_keys[key] = self.output_path
+
+        if self.psim > 0 and (state is None) != (self._initial_state is None):
+            raise ValueError("Either all or none of the parallel simulations should have a saved state.")
+
+        if state is not None:
+            if self.psim == 0:
+                self.rvi.start_date = state.end_date
+            elif state.end_date != self.rvi.start_date:
+                raise ValueError("The saved states of parallel simulations should all end on the same date.")
+
+        self._initial_state = state
+
+    def _save_states(self):
+        """Save the end state of each run in the state store and append the new time steps to its history."""
+        history = []
+        for key, path in self._state_keys.items():
+            solution = self._get_output('*solution.rvc', path)[0]
+            hydrograph = self._get_output('*Hydrographs.nc', path)[0]
+            self.state_store.save(key, solution, hydrograph)
+            history.append(self.state_store.hydrograph(key))
+
+        self.outputs['history'] = history[0] if len(history) == 1 else history
+
+    @staticmethod
+    def _batchable(pdict):
+        """Return whether the parallel runs only differ by their basin properties."""
+        for key in ['params', 'hrus']:
+            vals = pdict[key]
+            if any(not np.array_equal(v, vals[0]) for v in vals[1:]):
+                return False
+        return True
+
+    def _prepare_batched_run(self, ts, pdict, nloops):
+        """Write a single configuration simulating each basin as an independent subbasin.
+
+        The rvh and rvt files are rendered for each basin, then merged so that basin `i` becomes subbasin and HRU
+        `i + 1`, forced by its own gauge and compared against its own observations. HRUs are mapped to their gauge
+        through a gauge weights file. Note that the watershed storage output aggregates all basins.
+
+        Returns
+        -------
+        list
+          The (psim, command, cwd, done) description of the single run, or an empty list if its outputs were restored
+          from the result cache.
+        """
+        ts = tuple(map(Path, ts))
+        self.psim = 0
+        forcing = self._update_forcing(ts)
+
+        # Render the configuration of each basin, using the same creation time stamp everywhere.
+        now = self._workspace_now or self.rvi.now
+        if self.reuse_workspace:
+            self._workspace_now = now
+        texts = defaultdict(list)
+        for i in range(nloops):
+            for key, val in pdict.items():
+                if val[i] is not None:
+                    self.assign(key, val[i])
+
+            with self.timings.phase('derived_parameters'):
+                self.derived_parameters()
+
+            with self._forcing_subsets(*forcing, by_station=False), self.timings.phase('dump_rv'):
+                params = self.parameters
+                params['now'] = now
+                for rvf in self.rvfiles:
+                    texts[rvf.ext].append(rvf.render(**params))
+
+        weights = '{}_weights.txt'.format(self.name)
+        contents = {ext: val[0] for (ext, val) in texts.items()}
+        contents['rvh'] = _merge_rvh(texts['rvh'])
+        contents['rvt'] = _merge_rvt(texts['rvt'])
+        contents['rvi'] += "\n:Interpolation INTERP_FROM_FILE {}\n".format(weights)
+
+        if not self.model_path.exists():
+            os.makedirs(self.model_path)
+            os.makedirs(self.output_path)
+
+        with self.timings.phase('dump_rv'):
+            for rvf in self.rvfiles:
+                fn = self.model_path / rvf.fn.name
+                _write_changed(fn, contents[rvf.ext])
+                self._createdrvs.append(fn)
+
+            _write_changed(self.model_path / weights, _gauge_weights(nloops))
+
+        with self.timings.phase('link'):
+            cmd = self._link_inputs(ts)
+
+        done = None
+        if self.cache is not None:
+            config = [contents[rvf.ext].replace(now, '') for rvf in self.rvfiles]
+            key = self.cache.key(config, list(ts) + [self.raven_exec])
+            if self.cache.restore(key, self.output_path):
+                return []
+            done = self._cache_store(key, self.output_path)
+
+        return [(self.psim, cmd, self.cmd_path, done), ]
+
+    def _cache_key(self, ts):
+        """Return the result cache key of the current run, or None if results are not cached.
+
+        Parameters
+        ----------
+        ts : sequence
+          Paths to input forcing files.
+        """
+        if self.cache is None:
+            return None
+
+        params = self.parameters
+        if 'now' in params:
+            params['now'] = ''  # The creation time stamp does not influence the simulation.
+        config = [rvf.render(**params) for rvf in self.rvfiles]
+        if self._initial_state is not None:
+            config.append(self._initial_state.solution.read_text())
+        return self.cache.key(config, list(ts) + [self.raven_exec])
+
+    def _cache_store(self, key, path):
+        """Return a function storing the run outputs in the result cache once the process has completed."""
+        cache = self.cache
+
+        def store(proc):
+            if proc.returncode == 0 and any(Path(path).glob('*Hydrographs.nc')):
+                cache.store(key, path)
+
+        return store
+
+    def _launch(self, jobs):
+        """Execute the model runs, keeping at most `max_workers` processes alive at any time.
+
+        Parameters
+        ----------
+        jobs : sequence
+          Sequence of (psim, command, working directory, done) tuples, as returned by `_prepare_runs`.
+
+        Returns
+        -------
+        list
+          The completed processes, in the order they finished. The matching run indices are stored in `run_order`.
+
+        Each run is handed to `executor`, which blocks until it has completed. The wall time of the runs, the resources
+        used by each run and the bytes written are recorded in `timings`. The standard output and error of
+        each process are written to a log file in its working directory, so no pipe is kept open while it runs.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def execute(cmd, cwd, done):
+            size = disk_usage(cwd)
+            proc = self.executor(cmd, cwd, self._log_name)
+            self.timings.record('bytes_written', disk_usage(cwd) - size)
+            self.timings.record_usage(getattr(proc, 'rusage', None))
+            if done is not None:
+                done(proc)
+            return proc
+
+        procs = []
+        self.run_order = []
+        max_workers = max(1, min(self.max_workers or os.cpu_count(), len(jobs)))
+        with self.timings.phase('exec'):
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {pool.submit(execute, cmd, cwd, done): psim for (psim, cmd, cwd, done) in jobs}
+                for future in as_completed(futures):
+                    procs.append(future.result())
+                    self.run_order.append(futures[future])
 
         return procs
 
-    def __call__(self, ts, overwrite=False, **kwds):
-        self.setup(overwrite)
-        procs = self.run(ts, overwrite, **kwds)
+    async def _alaunch(self, jobs):
+        """Asynchronous equivalent of `_launch`. Runs are awaited through the executor's `acall`.
+
+        Parameters
+        ----------
+        jobs : sequence
+          Sequence of (psim, command, working directory, done) tuples, as returned by `_prepare_runs`.
+
+        Returns
+        -------
+        list
+          The completed processes, in the order they finished. The matching run indices are stored in `run_order`.
+        """
+        import asyncio
 
-        for proc in procs:
-            proc.wait()
-            # Julie: For debugging
-            # for line in iter(proc.stdout.readline, b''):
-            #    print(line)
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(max(1, self.max_workers or os.cpu_count()))
+        procs = []
+        self.run_order = []
+
+        async def execute(psim, cmd, cwd, done):
+            async with semaphore:
+                size = disk_usage(cwd)
+                proc = await self.executor.acall(cmd, cwd, self._log_name)
+                self.timings.record('bytes_written', disk_usage(cwd) - size)
+                self.timings.record_usage(getattr(proc, 'rusage', None))
+            if done is not None:
+                await loop.run_in_executor(None, done, proc)
+            procs.append(proc)
+            self.run_order.append(psim)
+
+        with self.timings.phase('exec'):
+            await asyncio.gather(*(execute(*job) for job in jobs))
+        return procs
+
+    async def arun(self, ts, overwrite=False, outputs=None, **kwds):
+        """Run the model and parse its results without blocking the event loop.
+
+        This is the asynchronous equivalent of calling the model instance, so many models can be driven concurrently
+        from a single thread. The setup, configuration and parsing of the results are run in the event loop's default
+        executor, and the configuration of concurrent models is rendered one model at a time.
+
+        Example
+        -------
+        >>> m = GR4JCN()
+        >>> await m.arun(ts, start_date=dt.datetime(2000, 1, 1), params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+        >>> m.q_sim
+        """
+        import asyncio
+        from functools import partial
+
+        loop = asyncio.get_event_loop()
+        self.timings = Timings(self.timing_callback)
+        jobs = await loop.run_in_executor(None, partial(self._aprepare, ts, overwrite, outputs, **kwds))
+        await self._alaunch(jobs)
+        await loop.run_in_executor(None, self._handle_results)
+
+    def _aprepare(self, ts, overwrite=False, outputs=None, **kwds):
+        """Set up the model directory and write the configuration of each run for `arun`."""
+        with _configure_lock:
+            self.select_outputs(outputs)
+            with self.timings.phase('setup'):
+                self.setup(overwrite)
+            return self._prepare_runs(ts, **kwds)
+
+    def __call__(self, ts, overwrite=False, outputs=None, **kwds):
+        """Run the model and parse its results.
+
+        Parameters
+        ----------
+        ts : path or sequence
+          Sequence of input file paths.
+        overwrite : bool
+          Whether or not to overwrite existing model and output files.
+        outputs : sequence
+          Outputs to collect, among 'hydrograph', 'storage', 'solution', 'diagnostics' and 'rvconfig'. If None, all
+          outputs are collected. Raven is configured not to write the outputs that are not selected, when possible.
+        **kwds : dict
+          Raven parameters used to fill configuration file templates.
+        """
+        self.timings = Timings(self.timing_callback)
+        self.select_outputs(outputs)
+        with self.timings.phase('setup'):
+            self.setup(overwrite)
+        self.run(ts, overwrite, **kwds)
+        self._handle_results()
+
+    def select_outputs(self, outputs=None):
+        """Set the outputs collected after a run and disable the Raven outputs that are not needed.
+
+        Parameters
+        ----------
+        outputs : sequence
+          Output names. If None, all outputs are selected.
+        """
+        if outputs is None:
+            outputs = self._output_keys
+        elif isinstance(outputs, six.string_types):
+            outputs = (outputs, )
+
+        unknown = set(outputs) - set(self._output_keys)
+        if unknown:
+            raise ValueError("Unrecognized outputs: {}. Should be in {}.".format(unknown, self._output_keys))
+
+        self.selected_outputs = tuple(outputs)
+        if isinstance(self.rvi, RVI):
+            self.rvi.suppress_output = [key for key in self._output_keys if key not in outputs]
+
+    def sweep(self, ts, design, bounds=None, n=None, seed=None, store=None, chunk_size=50, **kwds):
+        """Run the model for each parameter set of a sampling design.
+
+        Members are simulated in chunks of at most `chunk_size` parallel runs. The hydrograph and diagnostics of each
+        chunk are appended to a consolidated netCDF store, and the run directories are deleted before the next chunk,
+        so disk and memory usage do not depend on the number of members.
+
+        Parameters
+        ----------
+        ts : path or sequence
+          Sequence of input file paths.
+        design : {'grid', 'lhs', 'sobol'} or array
+          Sampling design, or explicit array of parameter sets (see `sweep.sample`).
+        bounds : tuple
+          Lower and upper bounds of each parameter.
+        n : int
+          Number of members (lhs, sobol) or of levels along each parameter (grid).
+        seed : int
+          Seed of the random number generator (lhs, sobol).
+        store : str, Path
+          Path to the netCDF store. Defaults to `sweep.nc` in the working directory.
+        chunk_size : int
+          Number of members simulated at once.
+        **kwds : dict
+          Other Raven parameters, shared by all members.
+
+        Returns
+        -------
+        Path
+          Path to the store, holding the `params` and `q_sim` of each member, and their diagnostics.
+        """
+        from .sweep import sample, append_members
+
+        params = sample(design, bounds, n, seed)
+        store = Path(store or self.workdir / 'sweep.nc')
+        if hasattr(self, 'params') and isinstance(self.params, type):
+            names = self.params._fields
+        else:
+            names = ['p{}'.format(i) for i in range(params.shape[1])]
+
+        for start in range(0, len(params), chunk_size):
+            chunk = params[start:start + chunk_size]
+            self(ts, overwrite=True, outputs=('hydrograph', 'diagnostics'), params=chunk, **kwds)
+            append_members(store, start, chunk, names, self.outputs['hydrograph'],
+                           self.diagnostics_table.to_dict('records'))
+
+        # Delete the run directories of the last chunk.
+        self.close()
+        self.outputs = {}
+        self.ind_outputs = {}
+        shutil.rmtree(str(self.exec_path), ignore_errors=True)
+        shutil.rmtree(str(self.final_path), ignore_errors=True)
+
+        return store
+
+    def _handle_results(self):
+        """Parse the model outputs, printing the error log if they cannot be found."""
         try:
-            self.parse_results()
+            with self.timings.phase('parse_results'):
+                self.parse_results()
+            if self.state_store is not None:
+                self._save_states()
+            if self.scratch is not None:
+                self._persist()
 
         except UserWarning as e:
             err = self.parse_errors()
@@ -426,19 +1042,37 @@ class Raven:
         # name.
         path = path or self.exec_path
 
+        # Previously opened outputs are now stale.
+        self.close()
+        self._diagnostics = None
+
         patterns = {'hydrograph': '*Hydrographs.nc',
                     'storage': '*WatershedStorage.nc',
                     'solution': '*solution.rvc',
                     'diagnostics': '*Diagnostics.csv',
                     }
 
+        for key in self._output_keys:
+            if key not in self.selected_outputs:
+                self.outputs.pop(key, None)
+                self.ind_outputs.pop(key, None)
+
         for key, pattern in patterns.items():
+            if key not in self.selected_outputs:
+                continue
             fns = self._get_output(pattern, path=path)
-            fns.sort()
+            fns.sort(key=_natural_key)
             self.ind_outputs[key] = fns
-            self.outputs[key] = self._merge_output(fns, pattern[1:])
+            with self.timings.phase('merge'):
+                self.outputs[key] = self._merge_output(fns, pattern[1:])
 
-        self.outputs['rvconfig'] = self._merge_output(self._createdrvs, 'rv.zip')
+        if 'diagnostics' in self.selected_outputs:
+            with self.timings.phase('diagnostics'):
+                self.diagnostics_table.to_csv(self.final_path / self._diagnostics_table_name)
+
+        if 'rvconfig' in self.selected_outputs:
+            with self.timings.phase('merge'):
+                self.outputs['rvconfig'] = self._merge_output(self._createdrvs, 'rv.zip')
 
     def _merge_output(self, files, name):
         """Merge multiple output files into one if possible, otherwise return a list of files.
@@ -453,14 +1087,13 @@ class Raven:
         outfn = self.final_path / name
 
         if name.endswith('.nc') and not isinstance(self, raven.models.RavenMultiModel):
-            ds = [xr.open_dataset(fn) for fn in files]
             try:
-                # We aggregate along the pdim dimensions.
-                out = xr.concat(ds, self._pdim, data_vars='different')
-                out.to_netcdf(outfn)
+                # We aggregate along the pdim dimensions, one file at a time.
+                _concat_netcdf(files, outfn, self._pdim)
                 return outfn
             except (ValueError, KeyError):
-                pass
+                if outfn.exists():
+                    outfn.unlink()
 
         # Let's zip the files that could not be merged.
         outfn = outfn.with_suffix('.zip')
@@ -473,10 +1106,23 @@ class Raven:
         return outfn
 
     def parse_errors(self):
-        files = self._get_output('Raven_errors.txt', self.exec_path)
+        try:
+            files = self._get_output('Raven_errors.txt', self.exec_path)
+        except UserWarning:  # Raven failed before writing its error log.
+            files = []
+
         out = ''
         for f in files:
             out += f.read_text()
+        return out + self._log_tails()
+
+    def _log_tails(self):
+        """Return the end of the standard output and error of the executables launched in `exec_path`."""
+        out = ''
+        for fn in sorted(self.exec_path.rglob(self._log_name)):
+            tail = _tail(fn)
+            if tail:
+                out += "\n{}:\n{}".format(fn, tail)
         return out
 
     def _assign_files(self, fns):
@@ -501,17 +1147,16 @@ class Raven:
 
         for fn in fns:
             if '.nc' in fn.suffix:
-                with xr.open_dataset(fn) as ds:
-                    for var, alt_names in self._variable_names.items():
-                        if var not in self.rvt.keys():
-                            continue
-                        for alt_name in alt_names:
-                            if alt_name in ds.data_vars:
-                                files[var] = fn
-                                var_names[var + '_var'] = alt_name
-                                dimensions[var] = ds[alt_name].dims
-                                shape[var] = ds[alt_name].shape
-                                break
+                meta = forcing_metadata(fn)
+                for var, alt_names in self._variable_names.items():
+                    if var not in self.rvt.keys():
+                        continue
+                    alt_name = meta.match(alt_names)
+                    if alt_name is not None:
+                        files[var] = fn
+                        var_names[var + '_var'] = alt_name
+                        dimensions[var] = meta.dims[alt_name]
+                        shape[var] = meta.shapes[alt_name]
 
         for var in self._variable_names.keys():
             if var in self.rvt.keys() and var not in files.keys():
@@ -559,9 +1204,10 @@ class Raven:
         end : datetime
           The last datetime of the forcing files.
         """
-
-        ds = xr.open_mfdataset(fns)
-        return ds.indexes['time'][0], ds.indexes['time'][-1]
+        metas = [forcing_metadata(fn) for fn in fns]
+        starts = [m.start for m in metas if m.start is not None]
+        ends = [m.end for m in metas if m.end is not None]
+        return min(starts), max(ends)
 
     def handle_date_defaults(self, ts):
 
@@ -576,6 +1222,54 @@ class Raven:
             if rvi.end_date == dt.datetime(1, 1, 1):
                 rvi.end_date = end
 
+    def _open_output(self, key):
+        """Return the dataset for an output, opening it on first access.
+
+        Outputs that could not be merged into a single file are opened as one dataset stacked along the parallel
+        dimension (see `_open_stacked`).
+        """
+        if key not in self._datasets:
+            fn = Path(self.outputs[key])
+            if fn.suffix == '.nc':
+                ds = xr.open_dataset(fn)
+            elif fn.suffix == '.zip':
+                ds = self._open_stacked(self.ind_outputs[key])
+            else:
+                raise ValueError
+            self._datasets[key] = ds
+
+        return self._datasets[key]
+
+    def _open_stacked(self, files):
+        """Open the output files of individual runs as one dask-backed dataset, without loading their data.
+
+        Files are stacked along the parallel dimension (`params`, `nbasins`, or `run` for other ensembles), labelled
+        with the coordinates returned by `_run_coords`. Coordinates that do not depend on the stacking dimension (e.g.
+        time) are taken from the first file instead of being compared across files.
+        """
+        dim = self._pdim or 'run'
+        ds = xr.open_mfdataset([str(fn) for fn in files], combine='nested', concat_dim=dim, data_vars='all',
+                               coords='minimal', compat='override')
+        return ds.assign_coords(**self._run_coords(files, dim, ds))
+
+    def _run_coords(self, files, dim, ds):
+        """Return the coordinates labelling the runs stacked by `_open_stacked`."""
+        if dim in ds.coords:
+            return {}
+        return {dim: np.arange(len(files))}
+
+    def close(self):
+        """Close the output datasets opened by `hydrograph`, `storage` and `q_sim`."""
+        for ds in self._datasets.values():
+            ds.close()
+        self._datasets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
     @property
     def q_sim(self):
         """Return a view of the hydrograph time series.
@@ -583,9 +1277,6 @@ class Raven:
         This view will be overwritten by successive calls to `run`. To make a copy of this DataArray that will
         persist in memory, use `q_sim.copy(deep=True)`.
         """
-        if isinstance(self.hydrograph, list):
-            return [h.q_sim for h in self.hydrograph]
-
         return self.hydrograph.q_sim
 
     @property
@@ -594,41 +1285,67 @@ class Raven:
 
         If the model is run multiple times, hydrograph will point to the latest version. To store the results of
         multiple runs, either create different model instances or explicitly copy the file to another disk location.
+        The file is opened once and stays open until the model is run again or `close` is called.
         """
-        if self.outputs['hydrograph'].suffix == '.nc':
-            return xr.open_dataset(self.outputs['hydrograph'])
-        elif self.outputs['hydrograph'].suffix == '.zip':
-            return [xr.open_dataset(fn) for fn in self.ind_outputs['hydrograph']]
-        else:
-            raise ValueError
+        return self._open_output('hydrograph')
 
     @property
     def storage(self):
-        if self.outputs['storage'].endswith('.nc'):
-            return xr.open_dataset(self.outputs['storage'])
-        elif self.outputs['storage'].endswith('.zip'):
-            return [xr.open_dataset(fn) for fn in self.ind_outputs['storage']]
-        else:
-            raise ValueError
+        return self._open_output('storage')
 
     @property
     def diagnostics(self):
-        diag = []
-        for fn in self.ind_outputs['diagnostics']:
+        diag = self.diagnostics_table.to_dict('records')
+        return diag if len(diag) > 1 else diag[0]
+
+    @property
+    def diagnostics_table(self):
+        """Return the diagnostics of all runs as a DataFrame indexed by run, with one column per metric.
+
+        The Diagnostics.csv files are parsed once, in parallel, and the table is kept until the model is run again. It
+        is also written to `final_path`, next to the merged hydrograph.
+        """
+        if self._diagnostics is None:
+            import pandas as pd
+
+            diag = self._read_diagnostics(self.ind_outputs['diagnostics'], self.max_workers)
+            self._diagnostics = pd.DataFrame.from_records(diag)
+            self._diagnostics.index.name = 'run'
+
+        return self._diagnostics
+
+    @staticmethod
+    def _read_diagnostics(files, max_workers=None):
+        """Return the list of diagnostics stored in Diagnostics.csv files, one dictionary per row.
+
+        Files are read by a pool of `max_workers` threads, and rows are returned in the order of `files`.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def read(fn):
+            diag = []
             with open(fn) as f:
-                reader = csv.reader(f.readlines())
+                reader = csv.reader(f)
                 header = next(reader)
-                content = next(reader)
 
-                out = dict(zip(header, content))
-                out.pop('')
+                # Batched basin runs store one row per observed basin.
+                for content in reader:
+                    if not content:
+                        continue
+                    out = dict(zip(header, content))
+                    out.pop('', None)
 
-            for key, val in out.items():
-                if 'DIAG' in key:
-                    out[key] = float(val)
-            diag.append(out)
+                    for key, val in out.items():
+                        if 'DIAG' in key:
+                            out[key] = float(val)
+                    diag.append(out)
+            return diag
 
-        return diag if len(diag) > 1 else diag[0]
+        if len(files) < 2:
+            return [row for fn in files for row in read(fn)]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers or os.cpu_count(), len(files)))) as pool:
+            return [row for rows in pool.map(read, files) for row in rows]
 
     @property
     def tags(self):
@@ -672,10 +1389,26 @@ class Ostrich(Raven):
     _rvext = ('rvi', 'rvp', 'rvc', 'rvh', 'rvt', 'txt')
     txt = RV()
 
+    def __init__(self, workdir=None):
+        super(Ostrich, self).__init__(workdir)
+        self.mpirun = 'mpirun'  # MPI launcher of parallel algorithms, which require the MPI build of Ostrich.
+        self.progress_callback = None  # Function called with (iteration, obj, params) after each model evaluation.
+        self.early_stopping = None  # EarlyStopping criterion terminating the calibration once it has converged.
+        self._stopped = False  # Whether Ostrich was terminated before the end of the calibration.
+
     @property
     def model_path(self):
         return self.exec_path / self.model_dir
 
+    def _exec_path(self):
+        """Calibrations always run in the working directory, since the Ostrich scripts copy the best outputs
+        relative to it."""
+        return self.workdir / 'exec'
+
+    def _cache_key(self, ts):
+        """Calibration runs are not cached."""
+        return None
+
     @staticmethod
     def _allowed_extensions():
         return Raven._allowed_extensions() + ('txt', )
@@ -690,6 +1423,19 @@ class Ostrich(Raven):
         """OSTRICH executable path."""
         return self.ostrich_cmd
 
+    @property
+    def bash_cmd(self):
+        """Bash command arguments. The ParallelDDS algorithm is launched on `txt.cores` MPI processes, each evaluating
+        the model in its own `processor_<rank>` directory. Other algorithms run on a single core."""
+        cmd = Raven.bash_cmd.fget(self)
+        algorithm = getattr(self.txt, 'algorithm', None)
+        cores = getattr(self.txt, 'cores', 1)
+        if algorithm == 'ParallelDDS':
+            return [self.mpirun, '-n', str(cores)] + cmd
+        if cores > 1:
+            raise ValueError("Only the ParallelDDS algorithm runs on multiple cores, not {}.".format(algorithm))
+        return cmd
+
     @property
     def cmd_path(self):
         """This is the main executable."""
@@ -734,7 +1480,7 @@ class Ostrich(Raven):
         self.write_save_best()
 
         # Create symbolic link to executable
-        os.symlink(self.ostrich_exec, str(self.cmd))
+        _symlink(self.ostrich_exec, self.cmd)
 
     def parse_results(self):
         """Store output files in the self.outputs dictionary."""
@@ -766,15 +1512,23 @@ class Ostrich(Raven):
         except UserWarning:  # Read in processor_0 directory instead.
             ost_err = self._get_output('OstErrors?.txt', path=self.proc_path)[0].read_text()
 
-        return "{}\n{}".format(ost_err, raven_err)
+        return "{}\n{}{}".format(ost_err, raven_err, self._log_tails())
 
     def parse_optimal_parameter_set(self):
         """Return dictionary of optimal parameter set."""
         import re
         txt = open(self.outputs['calibration']).read()
-        ops = re.search(r'.*Optimal Parameter Set(.*?)\n{2}', txt, re.DOTALL).groups()[0]
+        match = re.search(r'.*Optimal Parameter Set(.*?)\n{2}', txt, re.DOTALL)
+
+        # Ostrich was stopped before writing its final report. Use the best evaluation instead.
+        if match is None:
+            from .calibration import read_trajectory
 
-        p = re.findall('(\w+)\s*:\s*([\S]+)', ops)
+            names, values = read_trajectory(self.outputs['params_seq'])
+            best = values[np.argmin(values[:, 1])]
+            return OrderedDict(zip(names[2:], best[2:]))
+
+        p = re.findall('(\w+)\s*:\s*([\S]+)', match.groups()[0])
         return OrderedDict((k, float(v)) for k, v in p)
 
     def ost2raven(self, ops):
@@ -793,6 +1547,298 @@ class Ostrich(Raven):
         else:
             return ops.values()
 
+    def _launch(self, jobs):
+        """Execute the calibration, reporting each model evaluation to `progress_callback` while Ostrich runs.
+
+        If `early_stopping` is set, Ostrich is terminated once the criterion is met. The calibrated parameters are read
+        from the best evaluation stored in `OstModel0.txt`, and its outputs are saved again in `final_path` by
+        `_save_best`. Early stopping requires an executor able to terminate the runs in progress, such as
+        `LocalExecutor`.
+        """
+        self._stopped = False
+        if self.progress_callback is None and self.early_stopping is None:
+            return Raven._launch(self, jobs)
+
+        if self.early_stopping is not None and not self.executor.can_terminate:
+            raise ValueError("Early stopping requires an executor able to terminate runs in progress, not {}."
+                             .format(type(self.executor).__name__))
+
+        from .calibration import TrajectoryMonitor
+
+        criterion = self.early_stopping
+        callback = self.progress_callback
+
+        def update(*evaluation):
+            if criterion is not None:
+                criterion.update(*evaluation)
+            if callback is not None:
+                callback(*evaluation)
+
+        def check():
+            if criterion is not None and criterion():
+                self._stopped = True
+                self.executor.terminate()
+                return True
+            return False
+
+        if criterion is not None:
+            criterion.start()
+
+        monitor = TrajectoryMonitor(self.exec_path / 'OstModel0.txt', update, check=check)
+        monitor.start()
+        try:
+            procs = Raven._launch(self, jobs)
+        finally:
+            monitor.stop()
+
+        if self._stopped:
+            self._save_best()
+        return procs
+
+    def _save_best(self):
+        """Run the best evaluation recorded in `OstModel0.txt` again and save its outputs in `final_path`.
+
+        When Ostrich is terminated, `save_best.sh` may have been interrupted while copying the outputs of the best
+        evaluation, or not have been launched yet for it. The templates are filled with the best parameters in the
+        `best` directory, and the evaluation is run with the Ostrich scripts. The run is not handed to the executor,
+        so it cannot be terminated in turn.
+        """
+        from .calibration import read_trajectory
+
+        names, values = read_trajectory(self.exec_path / 'OstModel0.txt')
+        if not len(values):
+            return
+        best = values[np.argmin(values[:, 1])]
+        # Longer names first, so that par_x1 does not replace the beginning of par_x10.
+        ops = sorted(zip(names[2:], best[2:]), key=lambda item: -len(item[0]))
+
+        path = self.exec_path / 'best'
+        shutil.rmtree(str(path), ignore_errors=True)
+        shutil.copytree(str(self.model_path), str(path / self.model_dir), symlinks=True)
+        shutil.rmtree(str(path / self.model_dir / self.output_dir))
+        os.makedirs(str(path / self.model_dir / self.output_dir))
+
+        for tpl, fn in _file_pairs((self.exec_path / 'ostIn.txt').read_text()):
+            text = (self.exec_path / tpl).read_text()
+            for name, value in ops:
+                text = text.replace(name, repr(float(value)))
+            (path / fn).write_text(text)
+
+        with open(str(path / self._log_name), 'wb') as f:
+            subprocess.check_call(['bash', '-c', 'bash ../ostrich-runs-raven.sh && bash ../save_best.sh'],
+                                  cwd=str(path), stdout=f, stderr=subprocess.STDOUT)
+
+    def progress(self, ts, overwrite=False, outputs=None, **kwds):
+        """Run the calibration in a background thread and yield each model evaluation as it completes.
+
+        Parameters are the same as for `__call__`. Results are parsed once the calibration has completed. If the
+        iteration is stopped early, e.g. once the objective function plateaus, Ostrich is terminated and the results of
+        the best evaluation so far are parsed. Executors unable to terminate runs in progress complete the calibration
+        instead.
+
+        Yields
+        ------
+        (iteration, obj, params)
+          Evaluation number, objective function value and parameters of each model evaluation.
+
+        Example
+        -------
+        >>> m = GR4JCN_OST()
+        >>> for iteration, obj, params in m.progress(ts, max_iterations=500, ...):
+        ...     print(iteration, obj)
+        >>> m.calibrated_params
+        """
+        import queue
+        import threading
+
+        evaluations = queue.Queue()
+        errors = []
+        callback = self.progress_callback
+
+        def report(*evaluation):
+            evaluations.put(evaluation)
+            if callback is not None:
+                callback(*evaluation)
+
+        def target():
+            try:
+                self(ts, overwrite=overwrite, outputs=outputs, **kwds)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                evaluations.put(None)
+
+        self.progress_callback = report
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        try:
+            for evaluation in iter(evaluations.get, None):
+                yield evaluation
+        finally:
+            # The iteration was interrupted before the end of the calibration.
+            if thread.is_alive():
+                if self.executor.can_terminate:
+                    self._stopped = True
+                    self.executor.terminate()
+                else:
+                    warnings.warn("{} cannot terminate runs in progress: waiting for the calibration to complete."
+                                  .format(type(self.executor).__name__))
+            thread.join()
+            self.progress_callback = callback
+
+        if errors:
+            raise errors[0]
+
+    def multistart(self, ts, seeds=4, overwrite=False, outputs=None, **kwds):
+        """Run independent calibrations from different random seeds and select the best one.
+
+        Each start is calibrated in its own `start<k>` subdirectory of the working directory. Starts are executed
+        concurrently, at most `max_workers` at a time. Once they have completed, the outputs of the start reaching the
+        lowest objective function are assigned to `outputs`.
+
+        Parameters
+        ----------
+        ts : path or sequence
+          Sequence of input file paths.
+        seeds : int or sequence
+          Random seeds of the starts, or number of starts, seeded with 0, 1, ...
+        overwrite : bool
+          Whether or not to overwrite existing model and output files.
+        outputs : sequence
+          Outputs to collect (see `__call__`).
+        **kwds : dict
+          Raven and Ostrich parameters, shared by all starts.
+
+        Returns
+        -------
+        params
+          Calibrated parameters of the best start.
+        xr.Dataset
+          Lowest objective function (`obj`) and calibrated parameters (`params`) of each start, lowest objective
+          function reached after each evaluation (`trajectory`) and standard deviation of the calibrated parameters
+          across starts (`spread`).
+        """
+        from .calibration import read_trajectory, best_so_far
+
+        if isinstance(seeds, int):
+            seeds = range(seeds)
+        seeds = list(seeds)
+
+        self.timings = Timings(self.timing_callback)
+        self.select_outputs(outputs)
+
+        # Configuration files are rendered one start at a time, since the starts share their configuration objects.
+        seed = getattr(self.txt, '_random_seed', None)
+        self.starts = []
+        jobs = []
+        try:
+            for k, value in enumerate(seeds):
+                m = self._start(k)
+                with self.timings.phase('setup'):
+                    m.setup(overwrite)
+                runs = m._prepare_runs(ts, random_seed=value, **kwds)
+                jobs.extend((k, cmd, cwd, done) for (_, cmd, cwd, done) in runs)
+                self.starts.append(m)
+        finally:
+            if isinstance(self.txt, Ost):
+                self.txt.random_seed = -1 if seed is None else seed
+
+        Raven._launch(self, jobs)
+
+        trajectories = []
+        for m in self.starts:
+            m._handle_results()
+            trajectories.append(best_so_far(read_trajectory(m.outputs['params_seq'])[1][:, 1]))
+
+        # Objective function of each start, after each evaluation. Starts may stop after a different number of
+        # evaluations.
+        n = max(len(t) for t in trajectories)
+        trajectory = np.full((len(seeds), n), np.nan)
+        for k, t in enumerate(trajectories):
+            trajectory[k, :len(t)] = t
+
+        params = np.array([list(m.calibrated_params) for m in self.starts], dtype=float)
+        if hasattr(self, 'params') and isinstance(self.params, type):
+            names = list(self.params._fields)
+        else:
+            names = ['p{}'.format(i) for i in range(params.shape[1])]
+
+        obj = np.nanmin(trajectory, axis=1)
+        best = self.starts[int(np.argmin(obj))]
+        self.close()
+        self._diagnostics = None
+        self.outputs = dict(best.outputs)
+        self.ind_outputs = dict(best.ind_outputs)
+
+        ds = xr.Dataset({'obj': ('start', obj),
+                         'params': (('start', 'param'), params),
+                         'trajectory': (('start', 'evaluation'), trajectory),
+                         'spread': ('param', params.std(axis=0))},
+                        coords={'start': seeds, 'param': names})
+
+        return best.calibrated_params, ds
+
+    def _start(self, k):
+        """Return a copy of the model calibrated in the `start<k>` subdirectory of the working directory."""
+        import copy
+
+        m = copy.copy(self)
+        m.workdir = self.workdir / 'start{}'.format(k)
+        m.final_path = m.workdir / m.final_dir
+        m.outputs = {}
+        m.ind_outputs = {}
+        m._datasets = {}
+        m._signatures = {}
+        m._diagnostics = None
+        return m
+
+    def raven2ost(self, params):
+        """Return the values of the parameters calibrated by Ostrich matching Raven's parameters.
+
+        Note
+        ----
+        This method should be subclassed by emulators for which Ostrich has different parameters than the original
+        Raven model. It is the inverse of `ost2raven`.
+        """
+        return self.params(*params)
+
+    def start_from(self, params, hrus=None):
+        """Start the calibration from a parameter set instead of random values.
+
+        Parameters
+        ----------
+        params : sequence
+          Raven parameters, e.g. the `calibrated_params` of a previous calibration, the parameters of a donor catchment
+          returned by `read_gauged_params`, or the estimate of `multiple_linear_regression`. Set to None to start from
+          random values again.
+        hrus : sequence
+          HRU parameters, for models calibrating them (MOHYSE).
+
+        Example
+        -------
+        >>> m = GR4JCN_OST()
+        >>> m.start_from(previous.calibrated_params)
+        >>> m(ts, max_iterations=50, ...)
+
+        Note
+        ----
+        Only emulators defining the Raven parameters (`params`) and their initial values in the Ostrich template
+        (`txt.init`) can be started from a parameter set.
+        """
+        if not hasattr(self, 'params') or getattr(self.txt, 'init', None) is None:
+            raise TypeError("{} does not define the initial values of its parameters.".format(type(self).__name__))
+
+        if params is None:
+            self.txt.init = self.params(*('random', ) * len(self.params._fields))
+        else:
+            self.txt.init = self.raven2ost(params)
+
+        if getattr(self.txt, 'hrusinit', None) is not None:
+            if hrus is None:
+                self.txt.hrusinit = self.hrus(*('random', ) * len(self.hrus._fields))
+            else:
+                self.txt.hrusinit = self.hrus(*hrus)
+
     @property
     def calibrated_params(self):
         """The dictionary of optimal parameters estimated by Ostrich."""
@@ -801,12 +1847,228 @@ class Ostrich(Raven):
 
     @property
     def obj_func(self):
-        return np.loadtxt(self.outputs['params_seq'], skiprows=1)[-1, 1]
+        from .calibration import read_trajectory
+        return read_trajectory(self.outputs['params_seq'])[1][-1, 1]
 
     @property
     def optimized_parameters(self):
         """These are the raw parameters returned by Ostrich."""
-        return np.loadtxt(self.outputs['params_seq'], skiprows=1)[-1, 2:]
+        from .calibration import read_trajectory
+        return read_trajectory(self.outputs['params_seq'])[1][-1, 2:]
+
+
+def _natural_key(fn):
+    """Sort key ordering paths by the value of the numbers they contain, so that run p100 comes after p99."""
+    return [int(t) if t.isdigit() else t for t in re.split(r'(\d+)', str(fn))]
+
+
+def _split_fields(line):
+    """Return the comma or space separated fields of an rv table line."""
+    return re.findall(r'[^,\s]+', line)
+
+
+def _merge_rvh(texts):
+    """Merge the rvh configurations of lumped basins into one where each basin is an independent subbasin.
+
+    Rows of the :SubBasins, :HRUs and :SubBasinProperties tables are taken from each basin configuration and
+    renumbered so that basin `i` has subbasin and HRU ID `i + 1`.
+    """
+    tables = (':SubBasins', ':HRUs', ':SubBasinProperties')
+
+    def rows(text):
+        out = defaultdict(list)
+        table = None
+        columns = []
+        for line in text.splitlines():
+            s = line.strip()
+            if s.startswith(':End'):
+                table = None
+            elif s in tables:
+                table = s
+            elif table and s.startswith(':Attributes'):
+                columns = _split_fields(s)[1:]
+            elif table and s and not s.startswith(('#', ':')):
+                out[table].append((_split_fields(s), columns))
+        return out
+
+    basins = [rows(text) for text in texts]
+
+    out = []
+    table = None
+    for line in texts[0].splitlines():
+        s = line.strip()
+        if s.startswith(':End') and table:
+            for i, basin in enumerate(basins):
+                for fields, columns in basin[table]:
+                    fields = list(fields)
+                    fields[0] = str(i + 1)
+                    if table == ':HRUs' and 'BASIN_ID' in columns:
+                        fields[columns.index('BASIN_ID') + 1] = str(i + 1)
+                    out.append('  ' + ', '.join(fields))
+            table = None
+        elif s in tables:
+            table = s
+        elif table and s and not s.startswith(('#', ':')):
+            continue
+        out.append(line)
+
+    return '\n'.join(out) + '\n'
+
+
+def _merge_rvt(texts):
+    """Merge the rvt configurations of lumped basins into one with a gauge and an observation series per basin."""
+    pattern = re.compile(r'^\s*:Gauge\b.*?^\s*:EndGauge[^\n]*', re.M | re.S)
+
+    head = None
+    gauges = []
+    tails = []
+    for i, text in enumerate(texts):
+        match = list(pattern.finditer(text))
+        if len(match) != 1:
+            raise ValueError("Basins can only be batched if the rvt configuration defines a single :Gauge.")
+        match = match[0]
+
+        if head is None:
+            head = text[:match.start()]
+
+        lines = match.group(0).strip().splitlines()
+        lines[0] = ':Gauge basin_{}'.format(i + 1)
+        gauges.append('\n'.join(lines))
+
+        tail = text[match.end():]
+        tails.append(re.sub(r'(:ObservationData\s+HYDROGRAPH\s+)\d+', r'\g<1>{}'.format(i + 1), tail))
+
+    return head + '\n\n'.join(gauges) + ''.join(tails)
+
+
+def _gauge_weights(n):
+    """Return a gauge weights table assigning gauge `i` to HRU `i`."""
+    rows = ['  ' + ' '.join('1' if i == j else '0' for j in range(n)) for i in range(n)]
+    return '\n'.join([':GaugeWeightTable', '  {} {}'.format(n, n)] + rows + [':EndGaugeWeightTable', ''])
+
+
+def _concat_netcdf(files, outfn, dim):
+    """Concatenate netCDF files along a dimension, reading one file at a time.
+
+    The output file is created from the schema of the first file. Variables are stacked along `dim`, except
+    coordinate variables (e.g. time) and auxiliary coordinates (e.g. basin_name) that do not depend on `dim`, which are
+    copied from the first file. If `dim` is not a dimension of the input files, it is created with one element per
+    file. Otherwise, stacked variables without `dim` are repeated along it, as `xarray.concat` does. Memory usage does
+    not depend on the number of files.
+
+    Parameters
+    ----------
+    files : sequence
+      Paths to netCDF files sharing the same structure.
+    outfn : Path
+      Output file name.
+    dim : str
+      Name of the dimension to concatenate along.
+    """
+    import netCDF4 as nc
+
+    with nc.Dataset(str(files[0])) as src, nc.Dataset(str(outfn), 'w') as out:
+        out.setncatts({key: src.getncattr(key) for key in src.ncattrs()})
+
+        existing = dim in src.dimensions
+        sizes = {}
+        for dname, d in src.dimensions.items():
+            sizes[dname] = len(d)
+            size = None if (d.isunlimited() or dname == dim) else len(d)
+            out.createDimension(dname, size)
+        if not existing:
+            out.createDimension(dim, len(files))
+
+        aux = set()
+        for v in src.variables.values():
+            if 'coordinates' in v.ncattrs():
+                aux.update(v.getncattr('coordinates').split())
+
+        stacked = []
+        prepended = set()  # Variables stacked along a new leading `dim` axis.
+        for vname, v in src.variables.items():
+            dims = v.dimensions
+            if dim not in dims and (vname in src.dimensions or vname in aux):
+                copy = True
+            else:
+                copy = False
+                stacked.append(vname)
+                if dim not in dims:
+                    dims = (dim,) + dims
+                    prepended.add(vname)
+
+            attrs = {key: v.getncattr(key) for key in v.ncattrs() if key != '_FillValue'}
+            var = out.createVariable(vname, v.datatype, dims, fill_value=getattr(v, '_FillValue', None))
+            var.setncatts(attrs)
+            if copy:
+                var[:] = v[:]
+
+    offset = 0
+    with nc.Dataset(str(outfn), 'a') as out:
+        for i, fn in enumerate(files):
+            with nc.Dataset(str(fn)) as src:
+                for dname, size in sizes.items():
+                    if dname != dim and len(src.dimensions[dname]) != size:
+                        raise ValueError("Dimension {} of {} does not match the first file.".format(dname, fn))
+
+                n = len(src.dimensions[dim]) if existing else 1
+                for vname in stacked:
+                    var = out.variables[vname]
+                    data = src.variables[vname][:]
+                    index = [slice(None), ] * var.ndim
+                    if existing:
+                        index[var.dimensions.index(dim)] = slice(offset, offset + n)
+                        if vname in prepended:
+                            # Variables without `dim`, e.g. precip(time), are repeated for each element of `dim`.
+                            data = np.ma.stack([data, ] * n)
+                    else:
+                        index[0] = i
+                    var[tuple(index)] = data
+                offset += n
+
+
+def _file_pairs(ostin):
+    """Return the (template, file) names listed in the FilePairs section of an Ostrich configuration."""
+    match = re.search(r'^\s*BeginFilePairs\s*$(.*?)^\s*EndFilePairs', ostin, re.DOTALL | re.MULTILINE)
+    pairs = []
+    for line in match.group(1).splitlines() if match else []:
+        line = line.split('#')[0].strip()
+        if line:
+            tpl, fn = line.split(';')
+            pairs.append((tpl.strip(), fn.strip()))
+    return pairs
+
+
+def _write_changed(fn, text):
+    """Write `text` to `fn`, unless the file already has this content."""
+    fn = Path(fn)
+    if fn.is_file() and not fn.is_symlink() and fn.read_text() == text:
+        return False
+    fn.write_text(text)
+    return True
+
+
+def _symlink(src, dst):
+    """Create a symbolic link to `src`, replacing `dst` if it exists and points elsewhere."""
+    dst = Path(dst)
+    if dst.is_symlink():
+        if os.readlink(str(dst)) == str(src):
+            return
+        dst.unlink()
+    os.symlink(str(src), str(dst))
+
+
+def _tail(fn, size=4096):
+    """Return the last `size` bytes of a text file, starting at a line boundary."""
+    with open(str(fn), 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        n = f.tell()
+        f.seek(max(0, n - size))
+        text = f.read().decode('utf-8', errors='replace')
+
+    if n > size:
+        text = text.partition('\n')[2]
+    return text.strip()
 
 
 def make_executable(fn):
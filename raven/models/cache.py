@@ -0,0 +1,134 @@
+"""
+Result cache
+------------
+
+On-disk cache for the outputs of Raven simulations. Entries are keyed by a hash of the rendered configuration files
+and of the fingerprints (path, size, modification time) of the forcing files and Raven executable, so that identical
+runs are only simulated once. When the cache grows over its maximum size, the least recently used entries are
+evicted.
+
+Usage
+-----
+>>> m = GR4JCN()
+>>> m.cache = ResultCache('/tmp/raven-cache', max_size=2e9)
+>>> m(ts, params=...)  # Simulated
+>>> m(ts, params=..., overwrite=True)  # Outputs copied from the cache
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+class ResultCache:
+
+    def __init__(self, path=None, max_size=1e9):
+        """Create or open a result cache.
+
+        Parameters
+        ----------
+        path : str, Path
+          Directory storing the cache entries. If None, a directory is created in the system temporary directory.
+        max_size : int
+          Maximum size of the cache on disk (bytes).
+        """
+        self.path = Path(path or Path(tempfile.gettempdir()) / 'raven-cache')
+        self.max_size = max_size
+        os.makedirs(str(self.path), exist_ok=True)
+
+    @staticmethod
+    def fingerprint(fn):
+        """Return a string identifying the version of a file on disk."""
+        st = os.stat(str(fn))
+        return "{}:{}:{}".format(Path(fn).resolve(), st.st_size, st.st_mtime_ns)
+
+    def key(self, config, files):
+        """Return the cache key for a run.
+
+        Parameters
+        ----------
+        config : sequence
+          Rendered content of the configuration files.
+        files : sequence
+          Paths to the files the simulation depends on (forcing files, executable).
+        """
+        h = hashlib.sha1()
+        for content in config:
+            h.update(content.encode('utf-8'))
+        for fn in files:
+            h.update(self.fingerprint(fn).encode('utf-8'))
+        return h.hexdigest()
+
+    def _entry(self, key):
+        return self.path / key
+
+    def __contains__(self, key):
+        return self._entry(key).is_dir()
+
+    def restore(self, key, path):
+        """Copy the cached output files into `path`.
+
+        Returns
+        -------
+        bool
+          True if the key was found in the cache.
+        """
+        entry = self._entry(key)
+        if not entry.is_dir():
+            return False
+
+        os.makedirs(str(path), exist_ok=True)
+        for fn in entry.iterdir():
+            shutil.copy(str(fn), str(Path(path) / fn.name))
+
+        # Mark entry as recently used.
+        os.utime(str(entry))
+        return True
+
+    def store(self, key, path):
+        """Store the output files found in `path` under `key`, then evict old entries if needed."""
+        entry = self._entry(key)
+        if entry.is_dir():
+            return
+
+        # Copy in a temporary directory first so incomplete entries are never visible.
+        tmp = Path(tempfile.mkdtemp(dir=str(self.path), prefix='.tmp-'))
+        for fn in Path(path).iterdir():
+            if fn.is_file():
+                shutil.copy(str(fn), str(tmp / fn.name))
+
+        try:
+            os.rename(str(tmp), str(entry))
+        except OSError:  # Stored concurrently by another run.
+            shutil.rmtree(str(tmp), ignore_errors=True)
+
+        self.evict()
+
+    def entries(self):
+        """Return a list of (path, size, last access time) for each cache entry."""
+        out = []
+        for entry in self.path.iterdir():
+            if entry.is_dir() and not entry.name.startswith('.'):
+                size = sum(fn.stat().st_size for fn in entry.iterdir())
+                out.append((entry, size, entry.stat().st_mtime))
+        return out
+
+    @property
+    def size(self):
+        """Total size of the cache entries (bytes)."""
+        return sum(size for (_, size, _) in self.entries())
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits within `max_size`."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for (_, size, _) in entries)
+        while entries and total > self.max_size:
+            entry, size, _ = entries.pop(0)
+            shutil.rmtree(str(entry), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for entry, _, _ in self.entries():
+            shutil.rmtree(str(entry), ignore_errors=True)
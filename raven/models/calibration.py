@@ -0,0 +1,196 @@
+"""
+Calibration utilities
+---------------------
+
+Tools to follow and compare Ostrich calibrations from the `OstModel?.txt` files, which store the objective function
+value and parameters of each model evaluation. `TrajectoryMonitor` follows the file while Ostrich is running, and
+reports each new evaluation to a callback (see `Ostrich.progress_callback` and `Ostrich.progress`). `EarlyStopping`
+decides when a calibration has converged, so it can be terminated before its evaluation budget is exhausted.
+
+Usage
+-----
+>>> names, values = read_trajectory('/tmp/.../exec/OstModel0.txt')
+>>> best_so_far(values[:, 1])
+
+>>> m = GR4JCN_OST()
+>>> m.early_stopping = EarlyStopping(epsilon=1e-3, patience=100, timeout=3600)
+>>> m(ts, max_iterations=5000, ...)
+>>> m.early_stopping.reason
+'No improvement greater than 0.001 over 100 evaluations.'
+"""
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def _parse(lines):
+    """Return the rows of numbers found in `lines`, skipping lines that cannot be parsed (e.g. being written)."""
+    rows = []
+    for line in lines:
+        try:
+            row = [float(v) for v in line.split()]
+        except ValueError:
+            continue
+        if row:
+            rows.append(row)
+    return rows
+
+
+def read_trajectory(fn):
+    """Return the model evaluations recorded by Ostrich.
+
+    Parameters
+    ----------
+    fn : str, Path
+      Path to the `OstModel?.txt` file.
+
+    Returns
+    -------
+    names : list
+      Column names: the run number, the objective function and the name of each calibrated parameter.
+    values : ndarray
+      Value of each column for each model evaluation (evaluations, columns).
+    """
+    with open(str(fn)) as f:
+        names = f.readline().split()
+        rows = _parse(f)
+
+    # Rows are as long as the first one, a row being written is shorter.
+    n = len(rows[0]) if rows else len(names)
+    return names, np.array([row for row in rows if len(row) == n], dtype=float).reshape(-1, n)
+
+
+def best_so_far(obj):
+    """Return the lowest objective function value reached after each evaluation, as Ostrich minimizes it."""
+    return np.minimum.accumulate(np.asarray(obj, dtype=float))
+
+
+class TrajectoryReader:
+    """Incrementally read the model evaluations appended to an `OstModel?.txt` file."""
+
+    def __init__(self, fn):
+        """
+        Parameters
+        ----------
+        fn : str, Path
+          Path to the `OstModel?.txt` file, which may not exist yet.
+        """
+        self.fn = Path(fn)
+        self.names = None
+        self._offset = 0
+        self._partial = ''
+        self._columns = None
+
+    def read(self):
+        """Return the evaluations completed since the last call, as (iteration, obj, params) tuples."""
+        try:
+            with open(str(self.fn)) as f:
+                f.seek(self._offset)
+                text = f.read()
+                self._offset = f.tell()
+        except FileNotFoundError:
+            return []
+
+        # Keep the last line until it is complete.
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+
+        if self.names is None and lines:
+            self.names = lines.pop(0).split()
+
+        rows = _parse(lines)
+        if self._columns is None and rows:
+            self._columns = len(rows[0])
+
+        return [(int(row[0]), row[1], row[2:]) for row in rows if len(row) == self._columns]
+
+
+class TrajectoryMonitor(threading.Thread):
+    """Thread following an `OstModel?.txt` file while Ostrich is running.
+
+    The callback is called with the iteration, objective function and parameters of each new model evaluation.
+    """
+
+    def __init__(self, fn, callback, poll=1.0, check=None):
+        """
+        Parameters
+        ----------
+        fn : str, Path
+          Path to the `OstModel?.txt` file, which may not exist yet.
+        callback : function
+          Function called with (iteration, obj, params) for each model evaluation.
+        poll : float
+          Interval between reads of the file (s).
+        check : function
+          Function called after each read of the file. The monitor stops once it returns True.
+        """
+        super(TrajectoryMonitor, self).__init__(daemon=True)
+        self.reader = TrajectoryReader(fn)
+        self.callback = callback
+        self.poll = poll
+        self.check = check
+        self._done = threading.Event()
+
+    def update(self):
+        """Report the evaluations completed since the last update."""
+        for evaluation in self.reader.read():
+            self.callback(*evaluation)
+
+    def run(self):
+        while not self._done.wait(self.poll):
+            self.update()
+            if self.check is not None and self.check():
+                break
+
+    def stop(self):
+        """Stop following the file, reporting the last evaluations."""
+        self._done.set()
+        self.join()
+        self.update()
+
+
+class EarlyStopping:
+    """Convergence criterion of a calibration, based on the improvement of the objective function and wall time."""
+
+    def __init__(self, epsilon=0., patience=None, timeout=None):
+        """
+        Parameters
+        ----------
+        epsilon : float
+          Minimum decrease of the objective function considered as an improvement.
+        patience : int
+          Number of evaluations without improvement after which the calibration has converged. If None, the
+          improvement is not checked.
+        timeout : float
+          Wall time after which the calibration is stopped (s). If None, there is no time limit.
+        """
+        self.epsilon = epsilon
+        self.patience = patience
+        self.timeout = timeout
+        self.start()
+
+    def start(self):
+        """Reset the criterion at the start of a calibration."""
+        self._start = time.time()
+        self._best = np.inf
+        self._since = 0
+        self.reason = None
+
+    def update(self, iteration, obj, params):
+        """Record a model evaluation."""
+        if obj < self._best - self.epsilon:
+            self._best = obj
+            self._since = 0
+        else:
+            self._since += 1
+
+    def __call__(self):
+        """Return True if the calibration should be stopped, setting `reason`."""
+        if self.patience is not None and self._since >= self.patience:
+            self.reason = "No improvement greater than {} over {} evaluations.".format(self.epsilon, self.patience)
+        elif self.timeout is not None and time.time() - self._start > self.timeout:
+            self.reason = "Wall time budget of {} s exhausted.".format(self.timeout)
+
+        return self.reason is not None
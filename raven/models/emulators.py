@@ -3,6 +3,7 @@ from pathlib import Path
 
 from raven.models import Raven, Ostrich
 from .rv import RV, RVT, RVI, Ost
+from .forcing import forcing_metadata
 
 
 class GR4JCN(Raven):
@@ -31,6 +32,7 @@ class GR4JCN_OST(Ostrich, GR4JCN):
               max_iterations=50,
               lowerBounds=GR4JCN.params(None, None, None, None, None, None),
               upperBounds=GR4JCN.params(None, None, None, None, None, None),
+              init=GR4JCN.params(*('random', ) * 6),
               )
 
     def derived_parameters(self):
@@ -64,7 +66,9 @@ class MOHYSE_OST(Ostrich, MOHYSE):
               lowerBounds=MOHYSE.params(None, None, None, None, None, None, None, None),
               upperBounds=MOHYSE.params(None, None, None, None, None, None, None, None),
               hruslowerBounds=MOHYSE.hrus(None, None),
-              hrusupperBounds=MOHYSE.hrus(None, None)
+              hrusupperBounds=MOHYSE.hrus(None, None),
+              init=MOHYSE.params(*('random', ) * 8),
+              hrusinit=MOHYSE.hrus('random', 'random'),
               )
 
     def derived_parameters(self):
@@ -108,6 +112,7 @@ class HMETS_OST(Ostrich, HMETS):
                                        None, None, None, None, None, None, None, None, None, None),
               upperBounds=HMETS.params(None, None, None, None, None, None, None, None, None, None, None,
                                        None, None, None, None, None, None, None, None, None, None),
+              init=HMETS.params(*('random', ) * 21),
               )
 
     def derived_parameters(self):
@@ -136,6 +141,27 @@ class HMETS_OST(Ostrich, HMETS):
         out[20] *= 1000
         return self.params(*out)
 
+    def raven2ost(self, params):
+        """Return the values of the parameters calibrated by Ostrich matching Raven's parameters.
+
+        Parameters
+        ----------
+        params : sequence
+          HMETS parameters, in the order of `HMETS.params`.
+
+        Returns
+        -------
+        HMETSParams named tuple
+          Parameters calibrated by Ostrich, i.e. the differences between the maximum and minimum melt factors and
+          snow water index, and the soil layer thicknesses in meters.
+        """
+        out = list(params)
+        out[5] -= out[4]
+        out[9] -= out[8]
+        out[19] /= 1000
+        out[20] /= 1000
+        return self.params(*out)
+
 
 class HBVEC(GR4JCN):
     identifier = 'hbvec'
@@ -152,18 +178,19 @@ class HBVEC(GR4JCN):
     rvh = RV(name=None, area=None, elevation=None, latitude=None, longitude=None)
 
     def derived_parameters(self):
-        import xarray as xr
-
         self.rvd['one_plus_par_x15'] = self.rvp.params.par_x15 + 1.0
         self.rvd['par_x11_half'] = self.rvp.params.par_x11 / 2.0
 
-        tasmax = xr.open_dataset(self.rvt.tasmax)[self.rvt.tasmax_var]
-        tasmin = xr.open_dataset(self.rvt.tasmin)[self.rvt.tasmin_var]
-        evap = xr.open_dataset(self.rvt.evspsbl)[self.rvt.evspsbl_var]
+        self._monthly_averages()
 
-        tas = (tasmax + tasmin) / 2.
-        self.rvd.mat = self.mat(*tas.groupby('time.month').mean().values)
-        self.rvd.mae = self.mae(*evap.groupby('time.month').mean().values)
+    def _monthly_averages(self):
+        """Set the monthly average temperature and evapotranspiration from the forcing files."""
+        tasmax = forcing_metadata(self.rvt.tasmax).climatology(self.rvt.tasmax_var)
+        tasmin = forcing_metadata(self.rvt.tasmin).climatology(self.rvt.tasmin_var)
+        evap = forcing_metadata(self.rvt.evspsbl).climatology(self.rvt.evspsbl_var)
+
+        self.rvd.mat = self.mat(*((tasmax + tasmin) / 2.))
+        self.rvd.mae = self.mae(*evap)
 
 
 class HBVEC_OST(Ostrich, HBVEC):
@@ -178,18 +205,11 @@ class HBVEC_OST(Ostrich, HBVEC):
                               None, None, None, None, None, None, None, None, None, None),
               upperBounds=high(None, None, None, None, None, None, None, None, None, None, None,
                                None, None, None, None, None, None, None, None, None, None),
+              init=HBVEC.params(*('random', ) * 21),
               )
 
     def derived_parameters(self):
-        import xarray as xr
-
-        tasmax = xr.open_dataset(self.rvt.tasmax)[self.rvt.tasmax_var]
-        tasmin = xr.open_dataset(self.rvt.tasmin)[self.rvt.tasmin_var]
-        evap = xr.open_dataset(self.rvt.evspsbl)[self.rvt.evspsbl_var]
-
-        tas = (tasmax + tasmin) / 2.
-        self.rvd.mat = self.mat(*tas.groupby('time.month').mean().values)
-        self.rvd.mae = self.mae(*evap.groupby('time.month').mean().values)
+        self._monthly_averages()
 
 
 def get_model(name):
@@ -0,0 +1,455 @@
+"""
+Executors
+---------
+
+Backends launching the model executables. `Raven._launch` schedules the parallel runs of a model (at most
+`max_workers` at a time) and hands each of them to the model's `executor`, which blocks until the run has completed.
+
+LocalExecutor
+  Launch the executable as a child process of the current process (default).
+PoolExecutor
+  Launch the executable from a pool of worker processes.
+QueueExecutor
+  Ship the model directory to remote workers through a broker directory shared with the workers, e.g. on a network
+  file system. Workers are started on each node with `raven worker <broker>`, or with `QueueWorker(broker).run()`.
+  Forcing files and executables are not shipped: workers should see them at the same paths, e.g. on a shared file
+  system.
+
+Usage
+-----
+>>> m = GR4JCN()
+>>> m.executor = QueueExecutor('/shared/raven-broker')
+>>> m(ts, params=[...])  # Runs are executed by the workers polling /shared/raven-broker.
+"""
+import io
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+import traceback
+import types
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+class Executor:
+    """Base class for executors.
+
+    Executors are called with the command to launch, its working directory and the name of the log file storing its
+    standard output and error, relative to the working directory. They return an object with a `returncode`
+    attribute once the run has completed, and an `rusage` attribute holding the resource usage of the run, as returned
+    by `os.wait4`, or None if it is not available.
+
+    Executors setting `can_terminate` to True implement `terminate`, used to stop calibrations early.
+    """
+    can_terminate = False
+
+    def __call__(self, cmd, cwd, log):
+        raise NotImplementedError
+
+    async def acall(self, cmd, cwd, log):
+        """Asynchronous equivalent of calling the executor. Runs the blocking call in the event loop's executor."""
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self, cmd, cwd, log)
+
+    def shutdown(self):
+        """Release the resources held by the executor."""
+        pass
+
+    def terminate(self):
+        """Terminate the runs in progress."""
+        raise NotImplementedError("{} cannot terminate runs in progress.".format(type(self).__name__))
+
+
+_POSIX = os.name == 'posix'
+
+
+def _wait(proc):
+    """Wait for a child process to complete and store its resource usage in `proc.rusage`.
+
+    The resource usage is read from `os.wait4`, so it only covers this process and the processes it waited for, even
+    when other runs complete at the same time.
+    """
+    proc.rusage = None
+    if not hasattr(os, 'wait4'):  # Windows
+        proc.wait()
+        return proc
+
+    try:
+        _, status, proc.rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:  # Already waited for.
+        proc.wait()
+        return proc
+
+    if os.WIFSIGNALED(status):
+        proc.returncode = -os.WTERMSIG(status)
+    else:
+        proc.returncode = os.WEXITSTATUS(status)
+    return proc
+
+
+def _execute(cmd, cwd, log):
+    """Run a command, writing its standard output and error to `log`, and return its return code and resource usage."""
+    with open(str(Path(cwd) / log), 'wb') as f:
+        proc = _wait(subprocess.Popen([str(c) for c in cmd], cwd=str(cwd), stdout=f, stderr=subprocess.STDOUT))
+    return proc.returncode, proc.rusage
+
+
+def _stop_group(pgid, timeout=10.):
+    """Terminate the processes remaining in a process group and wait until they have exited.
+
+    Processes still running after `timeout` seconds are killed.
+    """
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):  # No process left in the group.
+        return
+
+    deadline = time.time() + timeout
+    while time.time() < deadline + timeout:
+        time.sleep(.05)
+        try:
+            os.killpg(pgid, signal.SIGKILL if time.time() > deadline else 0)
+        except (ProcessLookupError, PermissionError):
+            return
+
+
+class LocalExecutor(Executor):
+    """Launch the executable as a child process of the current process.
+
+    On POSIX systems, each run is the leader of a new process group. Terminating a run also terminates the processes it
+    launched, e.g. the Raven runs and scripts launched by Ostrich, and the executor only returns once they have all
+    exited.
+    """
+    can_terminate = True
+
+    def __init__(self):
+        self._procs = set()  # Processes in progress.
+        self._lock = threading.Lock()
+
+    def __call__(self, cmd, cwd, log):
+        with open(str(Path(cwd) / log), 'wb') as f:
+            proc = subprocess.Popen(cmd, cwd=cwd, stdout=f, stderr=subprocess.STDOUT, start_new_session=_POSIX)
+            with self._lock:
+                self._procs.add(proc)
+            try:
+                _wait(proc)
+            except BaseException:  # e.g. KeyboardInterrupt, which the new session does not receive.
+                self._signal(proc)
+                raise
+            finally:
+                if _POSIX:
+                    _stop_group(proc.pid)
+                with self._lock:
+                    self._procs.discard(proc)
+        return proc
+
+    async def acall(self, cmd, cwd, log):
+        """Launch the executable as an asyncio subprocess, so waiting for runs does not hold a thread each.
+
+        If the call is cancelled, e.g. by `asyncio.wait_for` on timeout, the run and the processes it launched are
+        terminated. The resource usage of asyncio subprocesses is not available.
+        """
+        import asyncio
+
+        if not _POSIX:
+            return await super().acall(cmd, cwd, log)
+
+        loop = asyncio.get_event_loop()
+        with open(str(Path(cwd) / log), 'wb') as f:
+            proc = await asyncio.create_subprocess_exec(*[str(c) for c in cmd], cwd=str(cwd), stdout=f,
+                                                        stderr=subprocess.STDOUT, start_new_session=True)
+        proc.rusage = None
+        with self._lock:
+            self._procs.add(proc)
+        try:
+            await proc.wait()
+        except BaseException:  # e.g. asyncio.CancelledError
+            self._signal(proc)
+            raise
+        finally:
+            await loop.run_in_executor(None, _stop_group, proc.pid)
+            with self._lock:
+                self._procs.discard(proc)
+        return proc
+
+    def terminate(self):
+        with self._lock:
+            procs = list(self._procs)
+
+        for proc in procs:
+            self._signal(proc)
+
+    @staticmethod
+    def _signal(proc):
+        """Send SIGTERM to a run and the processes it launched."""
+        try:
+            if _POSIX:
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+        except (ProcessLookupError, PermissionError):  # Already completed.
+            pass
+
+
+class PoolExecutor(Executor):
+    """Launch the executable from a pool of worker processes."""
+
+    def __init__(self, max_workers=None):
+        """
+        Parameters
+        ----------
+        max_workers : int
+          Number of worker processes. Defaults to the number of CPUs.
+        """
+        self.max_workers = max_workers
+        self._pool = None
+
+    def __call__(self, cmd, cwd, log):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        returncode, rusage = self._pool.submit(_execute, cmd, cwd, log).result()
+        proc = subprocess.CompletedProcess(cmd, returncode)
+        proc.rusage = rusage
+        return proc
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# Placeholder for the working directory in the commands sent to remote workers.
+_CWD = '{cwd}'
+
+
+# Subdirectories of the broker directory.
+_BROKER_DIRS = ('jobs', 'claimed', 'results', 'tmp')
+
+
+def _snapshot(path):
+    """Return the size and modification time of each file under `path`, keyed by relative path."""
+    out = {}
+    for root, _, files in os.walk(str(path)):
+        for fn in files:
+            fn = Path(root) / fn
+            st = fn.stat()
+            out[str(fn.relative_to(path))] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+def _contents(path):
+    """Return the directories and regular files under `path`, and the target of its symbolic links.
+
+    Returns
+    -------
+    names : list
+      Paths of the directories and regular files, relative to `path`, parents first.
+    links : dict
+      Absolute path of the file each symbolic link points to, keyed by relative path.
+    """
+    names = []
+    links = {}
+    for root, dirs, files in os.walk(str(path)):
+        for name in dirs + files:
+            fn = Path(root) / name
+            rel = str(fn.relative_to(path))
+            if fn.is_symlink():
+                links[rel] = str(fn.resolve())
+            else:
+                names.append(rel)
+    return names, links
+
+
+def _pack(path, names):
+    """Return a gzipped tar archive of the directories and files `names`, relative to `path`."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name in names:
+            tar.add(str(Path(path) / name), arcname=name, recursive=False)
+    return buffer.getvalue()
+
+
+def _usage(rusage):
+    """Return the resource usage fields recorded in `Timings`, or None."""
+    if rusage is None:
+        return None
+    return {key: getattr(rusage, key) for key in ('ru_utime', 'ru_stime', 'ru_maxrss')}
+
+
+def _write_atomic(fn, data, tmpdir):
+    """Write bytes to `fn` so that other processes never see a partial file.
+
+    The data is first written in `tmpdir`, on the same file system, so that the partial file does not match the
+    patterns polled by other processes.
+    """
+    tmp = Path(tmpdir) / '{}-{}'.format(uuid.uuid4().hex, fn.name)
+    tmp.write_bytes(data)
+    os.replace(str(tmp), str(fn))
+
+
+class QueueExecutor(Executor):
+    """Execute runs on remote workers through a broker directory.
+
+    The files of the model directory are archived in `<broker>/jobs`. A worker claims the job by moving its description
+    to `<broker>/claimed`, runs it in a temporary directory, and posts the files it created or modified to
+    `<broker>/results`. They are then extracted in the model directory, as if the run had happened locally.
+
+    The forcing files and executables the model directory links to are not archived. The worker links to the same
+    paths, which the configuration files also refer to, so they should be reachable from the workers, e.g. on a shared
+    file system. If a job fails on the worker, the error is appended to the log of the run.
+    """
+
+    def __init__(self, broker, poll=0.5, timeout=None):
+        """
+        Parameters
+        ----------
+        broker : str, Path
+          Directory shared with the workers.
+        poll : float
+          Interval between checks for completed jobs (s).
+        timeout : float
+          Maximum time to wait for a job to complete (s). If None, wait indefinitely.
+        """
+        self.broker = Path(broker)
+        self.poll = poll
+        self.timeout = timeout
+        for d in _BROKER_DIRS:
+            os.makedirs(str(self.broker / d), exist_ok=True)
+
+    def __call__(self, cmd, cwd, log):
+        cwd = Path(cwd)
+        uid = uuid.uuid4().hex
+
+        # Commands refer to the working directory, which is different on the worker.
+        args = [str(c).replace(str(cwd), _CWD) for c in cmd]
+
+        names, links = _contents(cwd)
+        _write_atomic(self.broker / 'jobs' / (uid + '.tar.gz'), _pack(cwd, names), self.broker / 'tmp')
+        _write_atomic(self.broker / 'jobs' / (uid + '.json'),
+                      json.dumps({'cmd': args, 'log': log, 'links': links}).encode('utf-8'), self.broker / 'tmp')
+
+        status = self.broker / 'results' / (uid + '.json')
+        start = time.time()
+        while not status.exists():
+            if self.timeout is not None and time.time() - start > self.timeout:
+                raise TimeoutError("Job {} was not completed within {} s.".format(uid, self.timeout))
+            time.sleep(self.poll)
+
+        result = json.loads(status.read_text())
+        archive = self.broker / 'results' / (uid + '.tar.gz')
+        if archive.exists():
+            with tarfile.open(str(archive), 'r:gz') as tar:
+                tar.extractall(str(cwd))
+
+        if result.get('error'):
+            with open(str(cwd / log), 'a') as f:
+                f.write("\nJob {} failed on the worker:\n{}".format(uid, result['error']))
+
+        for fn in (status, archive, self.broker / 'claimed' / (uid + '.json')):
+            if fn.exists():
+                fn.unlink()
+
+        proc = subprocess.CompletedProcess(cmd, result['returncode'])
+        proc.rusage = types.SimpleNamespace(**result['rusage']) if result.get('rusage') else None
+        return proc
+
+
+class QueueWorker:
+    """Worker executing the jobs posted by `QueueExecutor` in a broker directory."""
+
+    def __init__(self, broker, poll=0.5):
+        """
+        Parameters
+        ----------
+        broker : str, Path
+          Directory shared with the executors.
+        poll : float
+          Interval between checks for new jobs (s).
+        """
+        self.broker = Path(broker)
+        self.poll = poll
+        for d in _BROKER_DIRS:
+            os.makedirs(str(self.broker / d), exist_ok=True)
+
+    def claim(self):
+        """Claim the next job in the queue and return its identifier, or None if the queue is empty."""
+        for fn in sorted((self.broker / 'jobs').glob('*.json')):
+            try:
+                os.rename(str(fn), str(self.broker / 'claimed' / fn.name))
+            except OSError:  # Claimed by another worker.
+                continue
+            return fn.stem
+        return None
+
+    def execute(self, uid):
+        """Run a claimed job and post its results.
+
+        If the job cannot be run, a failed result holding the error is posted, so that the executor does not wait for
+        it indefinitely.
+        """
+        archive = self.broker / 'jobs' / (uid + '.tar.gz')
+        tmp = Path(tempfile.mkdtemp(prefix='raven-worker-'))
+        try:
+            job = json.loads((self.broker / 'claimed' / (uid + '.json')).read_text())
+            with tarfile.open(str(archive), 'r:gz') as tar:
+                tar.extractall(str(tmp))
+            archive.unlink()
+
+            for name, target in job.get('links', {}).items():
+                os.symlink(target, str(tmp / name))
+
+            before = _snapshot(tmp)
+            cmd = [arg.replace(_CWD, str(tmp)) for arg in job['cmd']]
+            returncode, rusage = _execute(cmd, tmp, job['log'])
+
+            after = _snapshot(tmp)
+            changed = [name for name, stat in after.items() if before.get(name) != stat]
+            _write_atomic(self.broker / 'results' / (uid + '.tar.gz'), _pack(tmp, changed), self.broker / 'tmp')
+            result = {'returncode': returncode, 'rusage': _usage(rusage)}
+
+        except Exception:
+            if archive.exists():
+                archive.unlink()
+            result = {'returncode': 1, 'rusage': None, 'error': traceback.format_exc()}
+
+        finally:
+            shutil.rmtree(str(tmp), ignore_errors=True)
+
+        _write_atomic(self.broker / 'results' / (uid + '.json'), json.dumps(result).encode('utf-8'),
+                      self.broker / 'tmp')
+
+    def run(self, max_jobs=None, timeout=None):
+        """Execute jobs as they are posted.
+
+        Parameters
+        ----------
+        max_jobs : int
+          Number of jobs to execute before returning. If None, run until `timeout`.
+        timeout : float
+          Time to wait for new jobs before returning (s). If None, wait indefinitely.
+        """
+        n = 0
+        idle = time.time()
+        while max_jobs is None or n < max_jobs:
+            uid = self.claim()
+            if uid is None:
+                if timeout is not None and time.time() - idle > timeout:
+                    break
+                time.sleep(self.poll)
+                continue
+
+            self.execute(uid)
+            n += 1
+            idle = time.time()
+
+        return n
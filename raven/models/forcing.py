@@ -0,0 +1,187 @@
+"""
+Forcing metadata
+----------------
+
+Index of the metadata of forcing netCDF files: variable names, dimensions, shapes, time bounds and monthly
+climatologies. Metadata is computed once per version of a file (identified by its path, size and modification time)
+and shared across runs and model instances, so that forcing files are not re-opened at every simulation.
+
+Forcing files can also be subset to the simulation window and station of a run (`subset_forcing`). Subsets are
+stored in a cache directory, keyed by the version of the source file, the variables, window and station, so they are
+extracted once and reused across runs.
+
+Usage
+-----
+>>> meta = forcing_metadata('/path/to/forcing.nc')
+>>> meta.match(['pr', 'precip'])
+'pr'
+>>> meta.start, meta.end
+>>> subset_forcing('/path/to/forcing.nc', ['pr', 'tas'], '/tmp/raven-forcing', start, end, index=12)
+PosixPath('/tmp/raven-forcing/forcing-....nc')
+"""
+import datetime as dt
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import xarray as xr
+
+_index = {}
+_lock = threading.Lock()
+
+
+class ForcingMetadata:
+
+    def __init__(self, fn):
+        """Read the metadata of a netCDF forcing file.
+
+        Parameters
+        ----------
+        fn : str, Path
+          Path to the netCDF file.
+        """
+        self.fn = Path(fn)
+        self.dims = {}
+        self.shapes = {}
+        self.start = None
+        self.end = None
+        self._climatology = {}
+
+        with xr.open_dataset(self.fn) as ds:
+            for name, da in ds.data_vars.items():
+                self.dims[name] = da.dims
+                self.shapes[name] = da.shape
+
+            if 'time' in ds.indexes:
+                time = ds.indexes['time']
+                self.start, self.end = time[0], time[-1]
+
+    @property
+    def variables(self):
+        """Names of the data variables stored in the file."""
+        return list(self.dims.keys())
+
+    def match(self, names):
+        """Return the first name in `names` that is a data variable of the file, or None."""
+        for name in names:
+            if name in self.dims:
+                return name
+        return None
+
+    def climatology(self, name):
+        """Return the monthly mean of a variable, computed on first access.
+
+        Parameters
+        ----------
+        name : str
+          Variable name.
+
+        Returns
+        -------
+        ndarray
+          Mean value for each month of the year.
+        """
+        if name not in self._climatology:
+            with xr.open_dataset(self.fn) as ds:
+                self._climatology[name] = ds[name].groupby('time.month').mean().values
+
+        return self._climatology[name]
+
+
+def _key(fn):
+    st = os.stat(str(fn))
+    return str(Path(fn).resolve()), st.st_mtime_ns, st.st_size
+
+
+def forcing_metadata(fn):
+    """Return the metadata of a forcing file, reading it only if the file is new or has changed on disk.
+
+    Parameters
+    ----------
+    fn : str, Path
+      Path to the netCDF file.
+
+    Returns
+    -------
+    ForcingMetadata
+      Metadata of the file.
+    """
+    key = _key(fn)
+    with _lock:
+        meta = _index.get(key)
+
+    if meta is None:
+        meta = ForcingMetadata(fn)
+        with _lock:
+            _index[key] = meta
+
+    return meta
+
+
+def clear_index():
+    """Forget all cached forcing metadata."""
+    with _lock:
+        _index.clear()
+
+
+def subset_forcing(fn, variables, path, start=None, end=None, index=None):
+    """Return a compact copy of a forcing file holding only a time window and station, creating it on first use.
+
+    The copy keeps the dimensions of the source file, so the station dimension has length 1 and the station index of
+    the subset is 0. Each variable is stored as a single chunk, so Raven reads it in one pass.
+
+    Parameters
+    ----------
+    fn : str, Path
+      Path to the netCDF file.
+    variables : sequence
+      Names of the variables to keep.
+    path : str, Path
+      Directory storing the subsets.
+    start, end : datetime
+      Simulation window. Forcing data is kept from one day before `start` to one day after `end`.
+    index : int
+      Index of the station along the spatial dimension of the variables. If None, all stations are kept.
+
+    Returns
+    -------
+    Path
+      Path to the subset.
+    """
+    path = Path(path)
+    variables = sorted(variables)
+
+    h = hashlib.sha1()
+    h.update(repr((_key(fn), variables, start, end, index)).encode('utf-8'))
+    out = path / "{}-{}.nc".format(Path(fn).stem, h.hexdigest()[:16])
+    if out.exists():
+        return out
+
+    os.makedirs(str(path), exist_ok=True)
+    meta = forcing_metadata(fn)
+    dims = meta.dims[variables[0]]
+
+    with xr.open_dataset(fn) as ds:
+        ds = ds[variables]
+        if start is not None and end is not None:
+            day = dt.timedelta(days=1)
+            ds = ds.sel(time=slice(start - day, end + day))
+        if index is not None and len(dims) == 2:
+            (station, ) = (d for d in dims if d != 'time')
+            ds = ds.isel({station: [index]})
+
+        encoding = {}
+        for name, da in ds.variables.items():
+            da.encoding.pop('chunksizes', None)
+            da.encoding.pop('original_shape', None)
+            if name in variables:
+                encoding[name] = {'chunksizes': da.shape, 'zlib': False}
+
+        # Write to a temporary file first, so concurrent runs never read a partial subset.
+        tmp = path / ".{}.{}".format(uuid.uuid4().hex, out.name)
+        ds.to_netcdf(str(tmp), encoding=encoding, unlimited_dims=())
+
+    os.replace(str(tmp), str(out))
+    return out
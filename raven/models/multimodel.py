@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from . base import Raven
 from . emulators import GR4JCN, HBVEC, HMETS, MOHYSE, get_model
 from . rv import RV, RVI
@@ -31,6 +33,15 @@ class RavenMultiModel(Raven):
             m.model_dir = m.name
             self._models.append(m)
 
+    def _run_coords(self, files, dim, ds):
+        """Label each run with the identifier of the model that produced it."""
+        identifiers = {m.model_dir: m.identifier for m in self._models}
+        models = [next(identifiers[part] for part in Path(fn).parts if part in identifiers) for fn in files]
+
+        coords = Raven._run_coords(self, files, dim, ds)
+        coords['model'] = (dim, models)
+        return coords
+
     def _rename_run_name(self, run_name=None):
         rns = set([m.rvi.run_name for m in self._models])
         if (run_name is not None) or (len(rns) < len(self._models)):
@@ -59,19 +70,32 @@ class RavenMultiModel(Raven):
         if overwrite:
             self.setup(overwrite)
 
+        return self._launch(self._prepare_runs(ts, **kwds))
+
+    def _prepare_runs(self, ts, **kwds):
+        """Write the configuration of each model and return the list of runs to execute."""
         self._rename_run_name(kwds.pop('run_name', None))
 
         p = {}
         for m in self._models:
             p[m.identifier] = kwds.pop(m.identifier, None)
 
-        procs = []
+        # Queue the runs of all models, so they share the same pool of workers.
+        jobs = []
         for m in self._models:
             # Add params to kwds if passed in run.
             kw = kwds.copy()
             if p[m.identifier]:
                 kw['params'] = p[m.identifier]
 
-            procs.extend(m.run(ts, **kw))
-
-        return procs
+            # Record the timings of all models together.
+            m.timings = self.timings
+            m.cache = self.cache
+            m.state_store = self.state_store
+            m.forcing_cache = self.forcing_cache
+            m.reuse_workspace = self.reuse_workspace
+            m.exec_path = self.exec_path
+            m.select_outputs(self.selected_outputs)
+            jobs.extend(m._prepare_runs(ts, **kw))
+
+        return jobs
@@ -1,6 +1,11 @@
 import six
 import datetime as dt
 import collections
+import operator
+import os
+import re
+import string
+import threading
 from pathlib import Path
 
 """
@@ -31,19 +36,86 @@ Simulation end date and duration are updated automatically when duration, start
 """
 
 
+_tag_pattern = re.compile(r"{([\.\w]+)}")
+_formatter = string.Formatter()
+
+# Templates shared by all model instances, keyed by resolved path.
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def _accessor(field):
+    """Return a function extracting the value of a replacement field (e.g. `params.GR4J_X1`) from the parameters."""
+    root, dot, attrs = field.partition('.')
+    if '[' in field or not root:
+        return lambda kwds: _formatter.get_field(field, (), kwds)[0]
+    if not dot:
+        return operator.itemgetter(root)
+
+    get = operator.attrgetter(attrs)
+    return lambda kwds: get(kwds[root])
+
+
 class RVFile:
 
     def __init__(self, fn):
+        """Read and compile a configuration file or template.
+
+        Instances are treated as immutable once created. Use `RVFile.cached` to share them across model instances.
+        """
         self.fn = Path(fn)
 
         self.ext = ""
         self._store_ext()
 
         self.content = ""
+        self._chunks = None
+        self.fields = frozenset()
         self._store_content()
 
+    @classmethod
+    def cached(cls, fn):
+        """Return the shared instance for the file, reading it from disk only on first use in the process.
+
+        Call `RVFile.clear_cache` after editing template files for the changes to be picked up by new model instances.
+        """
+        key = str(Path(fn).resolve())
+        with _templates_lock:
+            rvf = _templates.get(key)
+
+        if rvf is None:
+            rvf = cls(fn)
+            with _templates_lock:
+                rvf = _templates.setdefault(key, rvf)
+
+        return rvf
+
+    @staticmethod
+    def clear_cache():
+        """Forget all shared templates."""
+        with _templates_lock:
+            _templates.clear()
+
     def _store_content(self):
         self.content = self.fn.read_text()
+        self._compile()
+
+    def _compile(self):
+        """Parse the template once into literal text chunks and replacement field accessors.
+
+        `fields` holds the names of the parameters the template depends on, e.g. `params` for `{params.GR4J_X1}`.
+        Files that are not valid templates are left uncompiled and rendered with `str.format`.
+        """
+        try:
+            parsed = tuple(_formatter.parse(self.content))
+        except ValueError:
+            self._chunks = None
+            return
+
+        self._chunks = tuple((literal, None if field is None else _accessor(field), conversion, spec)
+                             for (literal, field, spec, conversion) in parsed)
+        self.fields = frozenset(re.match(r"\w*", field).group(0) for (_, field, _, _) in parsed
+                                if field is not None)
 
     def _store_ext(self):
         try:
@@ -60,23 +132,40 @@ class RVFile:
     def stem(self):
         return Path(self.fn.stem).stem
 
+    def render(self, **kwds):
+        """Return the file content with tags replaced by the given values."""
+        if not kwds:
+            return self.content
+        if self._chunks is None:
+            return self.content.format(**kwds)
+
+        out = []
+        for literal, get, conversion, spec in self._chunks:
+            out.append(literal)
+            if get is not None:
+                obj = get(kwds)
+                if conversion:
+                    obj = _formatter.convert_field(obj, conversion)
+                if '{' in spec:
+                    spec = _formatter.vformat(spec, (), kwds)
+                out.append(format(obj, spec))
+        return ''.join(out)
+
+    def signature(self, params):
+        """Return a string identifying the values of the parameters the template depends on."""
+        if self._chunks is None:
+            return repr(sorted(params.items()))
+        return repr([params.get(key) for key in sorted(self.fields)])
+
     def write(self, path, **kwds):
         fn = path / self.fn.name
-
-        content = self.content
-        if kwds:
-            content = content.format(**kwds)
-
-        fn.write_text(content)
+        fn.write_text(self.render(**kwds))
         return fn
 
     @property
     def tags(self):
         """Return a list of tags within the templates."""
-        import re
-        pattern = re.compile(r"{([\.\w]+)}")
-
-        return pattern.findall(self.content)
+        return _tag_pattern.findall(self.content)
 
 
 class RV(collections.Mapping):
@@ -191,6 +280,9 @@ class RVT(RV):
 
 
 class RVI(RV):
+    # Raven commands disabling an output, keyed by output name.
+    _suppress_commands = {'storage': ':DontWriteWatershedStorage'}
+
     def __init__(self, **kwargs):
         self.name = None
         self.area = None
@@ -207,9 +299,20 @@ class RVI(RV):
         self._duration = 1
         self._time_step = 1.0
         self._evaluation_metrics = 'NASH_SUTCLIFFE RMSE'
+        self._suppress_output = ()
 
         super(RVI, self).__init__(**kwargs)
 
+    @property
+    def suppress_output(self):
+        """Raven commands disabling the outputs that are not needed."""
+        return '\n'.join(self._suppress_commands[key] for key in self._suppress_output
+                         if key in self._suppress_commands)
+
+    @suppress_output.setter
+    def suppress_output(self, value):
+        self._suppress_output = tuple(value)
+
     @property
     def run_name(self):
         return self._run_name
@@ -305,6 +408,10 @@ class Ost(RV):
     def __init__(self, **kwargs):
         self._max_iterations = None
         self._random_seed = None
+        self._cores = 1
+        self._init = None
+        self._hrusinit = None
+        self._initial_values = 'UseRandomParamValues'
 
         super(Ost, self).__init__(**kwargs)
 
@@ -332,6 +439,51 @@ class Ost(RV):
         else:
             self._random_seed = None
 
+    @property
+    def init(self):
+        """Initial value of each calibrated parameter, or 'random'."""
+        return self._init
+
+    @init.setter
+    def init(self, x):
+        self._init = x
+        self._update_initial_values()
+
+    @property
+    def hrusinit(self):
+        """Initial value of each calibrated HRU parameter, or 'random'."""
+        return self._hrusinit
+
+    @hrusinit.setter
+    def hrusinit(self, x):
+        self._hrusinit = x
+        self._update_initial_values()
+
+    @property
+    def initial_values(self):
+        """DDS option starting the search from the initial parameter values (`init` and `hrusinit`) if any is set,
+        and from random values otherwise."""
+        return self._initial_values
+
+    def _update_initial_values(self):
+        init = list(self.init or ()) + list(self.hrusinit or ())
+        if any(value != 'random' for value in init):
+            self._initial_values = 'UseInitialParamValues'
+        else:
+            self._initial_values = 'UseRandomParamValues'
+
+    @property
+    def cores(self):
+        """Number of processes running a parallel calibration algorithm (e.g. ParallelDDS). Set to 0 to use all
+        available cores."""
+        return self._cores
+
+    @cores.setter
+    def cores(self, value):
+        if value < 0:
+            raise ValueError("The number of cores should be a positive integer: {}".format(value))
+        self._cores = value or os.cpu_count()
+
 
 def isinstance_namedtuple(x):
     a = isinstance(x, tuple)
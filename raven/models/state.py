@@ -0,0 +1,108 @@
+"""
+Model state store
+-----------------
+
+Persistent store of the end state (`solution.rvc`) and cumulative hydrograph of simulations, keyed by basin and
+parameter set. It is used to restart simulations from where the last one stopped, so that operational runs only
+simulate the new time steps instead of the whole historical record.
+
+Usage
+-----
+>>> m = GR4JCN()
+>>> m.state_store = StateStore('/data/raven-states')
+>>> m(ts, start_date=dt.datetime(1980, 1, 1), end_date=dt.datetime(2019, 1, 1), params=...)  # Cold start
+>>> m(ts, end_date=dt.datetime(2019, 1, 2), params=..., overwrite=True)  # Restarts on 2019-01-01
+>>> m.outputs['history']  # Hydrograph covering 1980-01-01 to 2019-01-02
+"""
+import datetime as dt
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import xarray as xr
+
+State = namedtuple('State', ('solution', 'end_date'))
+
+
+class StateStore:
+
+    solution = 'solution.rvc'
+    history = 'Hydrographs.nc'
+    end_date = 'end_date'
+
+    def __init__(self, path):
+        """Create or open a state store.
+
+        Parameters
+        ----------
+        path : str, Path
+          Directory storing the model states.
+        """
+        self.path = Path(path)
+        os.makedirs(str(self.path), exist_ok=True)
+
+    @staticmethod
+    def key(*values):
+        """Return the key identifying a basin and parameter set."""
+        return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+    def _entry(self, key):
+        return self.path / key
+
+    def get(self, key):
+        """Return the saved state for `key`, or None if the simulation was never run."""
+        entry = self._entry(key)
+        if not (entry / self.solution).exists():
+            return None
+
+        end = dt.datetime.strptime((entry / self.end_date).read_text().strip(), "%Y-%m-%d %H:%M:%S")
+        return State(entry / self.solution, end)
+
+    def hydrograph(self, key):
+        """Return the path to the cumulative hydrograph for `key`."""
+        return self._entry(key) / self.history
+
+    def save(self, key, solution, hydrograph):
+        """Save the end state of a simulation and append its hydrograph to the history.
+
+        Parameters
+        ----------
+        key : str
+          State key.
+        solution : Path
+          Path to the `solution.rvc` file written by Raven.
+        hydrograph : Path
+          Path to the hydrograph file written by Raven.
+        """
+        entry = self._entry(key)
+        os.makedirs(str(entry), exist_ok=True)
+
+        history = entry / self.history
+        with xr.open_dataset(hydrograph) as new:
+            if history.exists():
+                with xr.open_dataset(history) as old:
+                    new = new.sel(time=new.time > old.time[-1])
+                    ds = xr.concat([old, new], dim='time', data_vars='minimal', coords='minimal').load()
+            else:
+                ds = new.load()
+
+        # Write to a temporary file first, so the history is never left in a partial state.
+        fd, tmp = tempfile.mkstemp(dir=str(entry), suffix='.nc')
+        os.close(fd)
+        ds.to_netcdf(tmp)
+        os.replace(tmp, str(history))
+
+        end = ds.indexes['time'][-1]
+        shutil.copy(str(solution), str(entry / self.solution))
+        (entry / self.end_date).write_text(end.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def clear(self, key=None):
+        """Remove the saved state for `key`, or all states if key is None."""
+        if key is None:
+            for entry in self.path.iterdir():
+                shutil.rmtree(str(entry), ignore_errors=True)
+        else:
+            shutil.rmtree(str(self._entry(key)), ignore_errors=True)
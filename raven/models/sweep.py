@@ -0,0 +1,202 @@
+"""
+Parameter sweeps
+----------------
+
+Sampling designs for parameter sweeps, and the consolidated netCDF store the members of a sweep are written to. See
+`Raven.sweep`.
+
+Designs
+-------
+grid
+  Regular grid with `n` levels along each parameter (n ** d members).
+lhs
+  Latin hypercube sample of `n` members.
+sobol
+  Sobol sequence of `n` members (`n` should be a power of 2), randomized by a digital shift. Up to 40 parameters.
+array
+  Explicit array of parameter sets (members, parameters).
+
+Usage
+-----
+>>> m = GR4JCN()
+>>> m.sweep(ts, 'lhs', bounds=(low, high), n=10000, chunk_size=100, start_date=..., area=..., ...)
+PosixPath('/tmp/.../sweep.nc')
+"""
+import itertools
+
+import numpy as np
+
+# Primitive polynomials and initial direction numbers of the Sobol sequence for dimensions 2 to 40, from S. Joe and
+# F. Y. Kuo (2008), Constructing Sobol sequences with better two-dimensional projections (new-joe-kuo-6.21201).
+# The bits of each polynomial are its coefficients.
+_SOBOL_DIRECTIONS = (
+    (3, (1, )), (7, (1, 3)), (11, (1, 3, 1)), (13, (1, 1, 1)), (19, (1, 1, 3, 3)), (25, (1, 3, 5, 13)),
+    (37, (1, 1, 5, 5, 17)), (41, (1, 1, 5, 5, 5)), (47, (1, 1, 7, 11, 19)), (55, (1, 1, 5, 1, 1)),
+    (59, (1, 1, 1, 3, 11)), (61, (1, 3, 5, 5, 31)), (67, (1, 3, 3, 9, 7, 49)), (91, (1, 1, 1, 15, 21, 21)),
+    (97, (1, 3, 1, 13, 27, 49)), (103, (1, 1, 1, 15, 7, 5)), (109, (1, 3, 1, 15, 13, 25)), (115, (1, 1, 5, 5, 19, 61)),
+    (131, (1, 3, 7, 11, 23, 15, 103)), (137, (1, 3, 7, 13, 13, 15, 69)), (143, (1, 1, 3, 13, 7, 35, 63)),
+    (145, (1, 3, 5, 9, 1, 25, 53)), (157, (1, 3, 1, 13, 9, 35, 107)), (167, (1, 3, 1, 5, 27, 61, 31)),
+    (171, (1, 1, 5, 11, 19, 41, 61)), (185, (1, 3, 5, 3, 3, 13, 69)), (191, (1, 1, 7, 13, 1, 19, 1)),
+    (193, (1, 3, 7, 5, 13, 19, 59)), (203, (1, 1, 3, 9, 25, 29, 41)), (211, (1, 3, 5, 13, 23, 1, 55)),
+    (213, (1, 3, 7, 3, 13, 59, 17)), (229, (1, 3, 1, 3, 5, 53, 69)), (239, (1, 1, 5, 5, 23, 33, 13)),
+    (241, (1, 1, 7, 7, 1, 61, 123)), (247, (1, 1, 7, 9, 13, 61, 49)), (253, (1, 3, 3, 5, 3, 55, 33)),
+    (285, (1, 3, 1, 15, 31, 13, 49, 245)), (299, (1, 3, 5, 15, 31, 59, 63, 97)), (301, (1, 3, 1, 11, 11, 11, 77, 249)),
+)
+
+# Number of bits of the Sobol points.
+_SOBOL_BITS = 30
+
+
+def sample(design, bounds=None, n=None, seed=None):
+    """Return the parameter sets of a sampling design.
+
+    Parameters
+    ----------
+    design : {'grid', 'lhs', 'sobol'} or array
+      Sampling design, or explicit array of parameter sets.
+    bounds : tuple
+      Lower and upper bounds of each parameter.
+    n : int
+      Number of members (lhs, sobol) or of levels along each parameter (grid).
+    seed : int
+      Seed of the random number generator (lhs, sobol).
+
+    Returns
+    -------
+    ndarray
+      Parameter sets (members, parameters).
+    """
+    if not isinstance(design, str):
+        return np.atleast_2d(np.asarray(design, dtype=float))
+
+    if bounds is None or n is None:
+        raise ValueError("The bounds and size of the {} design should be given.".format(design))
+
+    low, high = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+    d = len(low)
+
+    if design == 'grid':
+        levels = [np.linspace(lo, hi, n) for (lo, hi) in zip(low, high)]
+        return np.array(list(itertools.product(*levels)))
+
+    rng = np.random.RandomState(seed)
+    if design == 'lhs':
+        unit = _lhs(n, d, rng)
+    elif design == 'sobol':
+        unit = _sobol(n, d, rng)
+    else:
+        raise ValueError("Design {} is not recognized. Should be one of grid, lhs, sobol.".format(design))
+
+    return low + unit * (high - low)
+
+
+def _lhs(n, d, rng):
+    """Return a Latin hypercube sample of `n` points in the `d`-dimensional unit cube.
+
+    Each dimension is split into `n` intervals of equal size, each holding one point, at a random position.
+    """
+    strata = np.array([rng.permutation(n) for _ in range(d)]).T
+    return (strata + rng.uniform(size=(n, d))) / n
+
+
+def _sobol(n, d, rng):
+    """Return the first `n` points of the `d`-dimensional Sobol sequence, randomized by a digital shift.
+
+    Points are generated in Gray code order (Bratley and Fox, 1988), with the direction numbers of Joe and Kuo (2008).
+    The random digital shift preserves the distribution properties of the sequence.
+    """
+    if d > len(_SOBOL_DIRECTIONS) + 1:
+        raise ValueError("Sobol designs are limited to {} parameters.".format(len(_SOBOL_DIRECTIONS) + 1))
+    if n > 2 ** _SOBOL_BITS:
+        raise ValueError("Sobol designs are limited to {} members.".format(2 ** _SOBOL_BITS))
+
+    bits = _SOBOL_BITS
+
+    # Direction numbers, as integers of `bits` bits. The first dimension is the van der Corput sequence.
+    v = np.zeros((d, bits), dtype=np.int64)
+    v[0] = 1 << np.arange(bits - 1, -1, -1)
+    for j, (poly, m) in enumerate(_SOBOL_DIRECTIONS[:d - 1], 1):
+        s = len(m)
+        for k in range(bits):
+            if k < s:
+                v[j, k] = m[k] << (bits - 1 - k)
+            else:
+                x = v[j, k - s] ^ (v[j, k - s] >> s)
+                for i in range(1, s):
+                    if (poly >> (s - i)) & 1:
+                        x ^= v[j, k - i]
+                v[j, k] = x
+
+    points = np.zeros((n, d), dtype=np.int64)
+    x = np.zeros(d, dtype=np.int64)
+    for i in range(1, n):
+        # Index of the lowest zero bit of i - 1.
+        c = (~(i - 1) & i).bit_length() - 1
+        x ^= v[:, c]
+        points[i] = x
+
+    shift = rng.randint(0, 2 ** bits, size=d).astype(np.int64)
+    return (points ^ shift) / 2. ** bits
+
+
+def append_members(store, start, params, names, hydrograph, diagnostics=None):
+    """Write the outputs of a chunk of sweep members into the store, creating it with the first chunk.
+
+    The store holds the `params` (member, param) used by each member, the simulated flows `q_sim` (member, time,
+    nbasins) and one variable per diagnostic (member).
+
+    Parameters
+    ----------
+    store : Path
+      Path to the netCDF store.
+    start : int
+      Index of the first member of the chunk.
+    params : ndarray
+      Parameter sets of the chunk (members, parameters).
+    names : sequence
+      Parameter names.
+    hydrograph : Path
+      Hydrograph file of the chunk, with a `params` dimension if the chunk has more than one member.
+    diagnostics : list
+      Diagnostics of each member of the chunk.
+    """
+    import netCDF4 as nc
+
+    end = start + len(params)
+    with nc.Dataset(str(hydrograph)) as src, nc.Dataset(str(store), 'a' if start else 'w') as out:
+        q = src.variables['q_sim']
+        dims = tuple(d for d in q.dimensions if d != 'params')
+        values = q[:]
+        if 'params' not in q.dimensions:
+            values = values[np.newaxis]
+
+        if start == 0:
+            out.createDimension('member', None)
+            out.createDimension('param', len(names))
+            for d in dims:
+                out.createDimension(d, len(src.dimensions[d]))
+
+            time = src.variables['time']
+            var = out.createVariable('time', time.datatype, time.dimensions)
+            var.setncatts({key: time.getncattr(key) for key in time.ncattrs()})
+            var[:] = time[:]
+
+            var = out.createVariable('param', str, ('param', ))
+            var[:] = np.array(names, dtype=object)
+
+            out.createVariable('params', 'f8', ('member', 'param'))
+
+            var = out.createVariable('q_sim', q.datatype, ('member', ) + dims, zlib=True,
+                                     fill_value=getattr(q, '_FillValue', None))
+            var.setncatts({key: q.getncattr(key) for key in q.ncattrs() if key != '_FillValue'})
+
+        out.variables['params'][start:end] = params
+        out.variables['q_sim'][start:end] = values
+
+        for i, diag in enumerate(diagnostics or []):
+            for key, val in diag.items():
+                if 'DIAG' not in key:
+                    continue
+                if key not in out.variables:
+                    out.createVariable(key, 'f8', ('member', ), fill_value=np.nan)
+                out.variables[key][start + i] = val
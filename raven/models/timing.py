@@ -0,0 +1,97 @@
+"""
+Run timings
+-----------
+
+Instrumentation of the phases of a model run (setup, configuration rendering, executable, output parsing). Durations
+of each phase are accumulated over the parallel runs of a model call, along with the CPU time and peak memory of each
+run's process and the number of bytes it wrote to disk.
+
+Timings are logged at the DEBUG level on the `RAVEN` logger, and passed to an optional callback as they are recorded.
+
+Usage
+-----
+>>> m = GR4JCN()
+>>> m.timing_callback = lambda name, value: print(name, value)
+>>> m(ts, params=...)
+>>> m.timings
+OrderedDict([('setup', 0.003), ('assign_files', 0.002), ..., ('exec', 1.2), ('child_cpu', 1.1), ...])
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+LOGGER = logging.getLogger("RAVEN")
+
+
+class Timings(OrderedDict):
+    """Dictionary of the durations (s) of the phases of a model run.
+
+    Besides the phase durations, the following entries are recorded when the executable is launched:
+
+    child_cpu
+      User and system CPU time used by the processes of the runs (s).
+    child_max_rss
+      Peak resident set size of the largest run process (kB on Linux, bytes on macOS).
+    bytes_written
+      Size of the files created by the runs in their working directories (bytes).
+
+    The resource usage of each run is that of its own process and of the processes it waited for, as reported by the
+    executor in the `rusage` attribute of the completed process. It is not recorded for executors that do not report
+    it, or on platforms without `os.wait4`.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Parameters
+        ----------
+        callback : callable
+          Function called with the name and value of each recorded entry.
+        """
+        super().__init__()
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def record(self, name, value, accumulate=True):
+        """Add `value` to the entry `name`, keep the largest of both if `accumulate` is 'max', or replace the entry if
+        `accumulate` is False."""
+        with self._lock:
+            if accumulate == 'max':
+                value = max(value, self.get(name, value))
+            elif accumulate:
+                value += self.get(name, 0)
+            self[name] = value
+
+        LOGGER.debug("%s: %s", name, value)
+        if self.callback is not None:
+            self.callback(name, value)
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager recording the wall time spent in its block under `name`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def record_usage(self, rusage):
+        """Record the resource usage of a completed run, as returned by `os.wait4`. Nothing is recorded if None."""
+        if rusage is None:
+            return
+        self.record('child_cpu', rusage.ru_utime + rusage.ru_stime)
+        self.record('child_max_rss', rusage.ru_maxrss, accumulate='max')
+
+
+def disk_usage(path):
+    """Return the total size of the regular files found under `path`, ignoring symbolic links (bytes)."""
+    total = 0
+    for root, _, files in os.walk(str(path)):
+        for fn in files:
+            fn = Path(root) / fn
+            if not fn.is_symlink():
+                total += fn.stat().st_size
+    return total
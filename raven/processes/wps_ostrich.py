@@ -14,5 +14,18 @@ class OstrichProcess(RavenProcess):
             "the `rvt` file, only provide the name of the forcing file, not an absolute or relative path."
     version = '0.1'
     model_cls = Ostrich
-    inputs = [wio.ts, wio.conf]
+    inputs = [wio.ts, wio.conf, wio.outputs]
     outputs = [wio.calibration, wio.hydrograph, wio.storage, wio.solution, wio.diagnostics, wio.calibparams]
+
+    def monitor(self, model, response):
+        """Report the share of the evaluation budget used and the best objective function found so far."""
+        best = [float('inf')]
+
+        def update(iteration, obj, params):
+            best[0] = min(obj, best[0])
+            budget = getattr(model.txt, 'max_iterations', None)
+            percent = min(99, max(1, int(100 * iteration / budget))) if budget else None
+            response.update_status('Ostrich evaluation {}, best objective function: {:.6g}'.format(iteration, best[0]),
+                                   percent)
+
+        model.progress_callback = update
@@ -112,6 +112,6 @@ class OstrichHBVECProcess(OstrichProcess):
                     'upperBounds': HBVEC_OST.params}
     inputs = [wio.ts, lowerBounds, upperBounds, wio.algorithm, wio.max_iterations, wio.start_date, wio.end_date,
               wio.duration, wio.run_name, wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation,
-              wio.random_seed]
+              wio.random_seed, wio.outputs] + wio.parallel_calibration
 
     keywords = ["Ostrich", "Calibration", "DDS"]
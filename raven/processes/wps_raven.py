@@ -18,7 +18,7 @@ class RavenProcess(Process):
     version = '0.1'
 
     tuple_inputs = {}
-    inputs = [wio.ts, wio.conf]
+    inputs = [wio.ts, wio.conf, wio.outputs]
     outputs = [wio.hydrograph, wio.storage, wio.solution, wio.diagnostics]
     model_cls = Raven
 
@@ -39,6 +39,10 @@ class RavenProcess(Process):
     def model(self, request):
         return self.model_cls(workdir=self.workdir)
 
+    def monitor(self, model, response):
+        """Report the progress of the model run through the response status. Subclassed by processes."""
+        pass
+
     def _handler(self, request, response):
         response.update_status('PyWPS process {} started.'.format(self.identifier), 0)
 
@@ -53,6 +57,11 @@ class RavenProcess(Process):
         # Input data files
         ts = [f.file for f in request.inputs.pop('ts')]
 
+        # Selected outputs
+        outputs = None
+        if 'outputs' in request.inputs:
+            outputs = [obj.data for obj in request.inputs.pop('outputs')]
+
         # Parse all other input parameters
         kwds = defaultdict(list)
         for name, objs in request.inputs.items():
@@ -73,10 +82,15 @@ class RavenProcess(Process):
                     model.assign(name, data)
 
         # Launch model with input files
-        model(ts=ts, **kwds)
+        self.monitor(model, response)
+        model(ts=ts, outputs=outputs, **kwds)
 
         # Store output files name. If an output counts multiple files, they'll be zipped.
-        for key in response.outputs.keys():
+        for key in list(response.outputs.keys()):
+            if key not in model.outputs:  # Output not selected
+                del response.outputs[key]
+                continue
+
             val = model.outputs[key]
             if isinstance(response.outputs[key], LiteralOutput):
                 response.outputs[key].data = str(val)
@@ -45,4 +45,4 @@ class RavenHMETSProcess(RavenProcess):
     tuple_inputs = {'params': HMETS.params}
 
     inputs = [wio.ts, params, wio.start_date, wio.end_date, wio.duration, wio.run_name,
-              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation]
+              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation, wio.outputs]
@@ -40,4 +40,4 @@ class RavenMOHYSEProcess(RavenProcess):
     tuple_inputs = {'params': MOHYSE.params, 'hrus': MOHYSE.hrus}
 
     inputs = [wio.ts, params, hrus, wio.start_date, wio.end_date, wio.duration, wio.run_name,
-              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation]
+              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation, wio.outputs]
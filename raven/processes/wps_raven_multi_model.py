@@ -36,7 +36,7 @@ class RavenMultiModelProcess(RavenProcess):
                     'mohyse': MOHYSE.params}
 
     inputs = [wio.ts, hmets, gr4jcn, hbvec, wio.start_date, wio.end_date, wio.duration, wio.run_name,
-              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation]
+              wio.name, wio.area, wio.latitude, wio.longitude, wio.elevation, wio.outputs]
     model_cls = RavenMultiModel
 
     def model(self, request):
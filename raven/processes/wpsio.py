@@ -6,6 +6,7 @@ This module contains the WPS inputs and outputs that are reused across multiple
 
 from pywps import LiteralInput, LiteralOutput, ComplexInput, ComplexOutput
 from pywps import FORMATS, Format
+from raven import config
 
 # ---------------------------------------- #
 # ---------------- Inputs ---------------- #
@@ -129,6 +130,14 @@ model_name = LiteralInput('model_name', 'Hydrological model identifier',
                           allowed_values=('HMETS', 'GR4JCN', 'MOHYSE'),
                           min_occurs=1)
 
+outputs = LiteralInput('outputs', 'Model outputs to return',
+                       abstract="Outputs collected after the simulation. Unselected outputs are not written by Raven "
+                                "when possible. All outputs are returned by default.",
+                       data_type='string',
+                       allowed_values=('hydrograph', 'storage', 'solution', 'diagnostics'),
+                       min_occurs=0,
+                       max_occurs=4)
+
 
 # --- #
 
@@ -192,7 +201,7 @@ algorithm = LiteralInput('algorithm', 'OSTRICH Algorithm to use to calibrate mod
                          abstract='Optimization algorithm to implement for this calibration run',
                          data_type='string',
                          default='DDS',
-                         allowed_values=('DDS', 'SCEUA'),
+                         allowed_values=('DDS', 'SCEUA') + (('ParallelDDS', ) if config.ostrich_mpi else ()),
                          min_occurs=0)
 
 max_iterations = LiteralInput('max_iterations', 'Maximum number of model evaluations for the calibration run (budget)',
@@ -209,6 +218,16 @@ random_seed = LiteralInput('random_seed', 'Seed for random number generator',
                            default=-1,
                            min_occurs=0)
 
+cores = LiteralInput('cores', 'Number of cores used by parallel calibration algorithms',
+                     abstract="Number of MPI processes running the ParallelDDS algorithm. Set to 0 to use all "
+                              "available cores.",
+                     data_type='integer',
+                     default=1,
+                     min_occurs=0)
+
+# Inputs of the parallel calibration algorithms, only offered if Ostrich was built with MPI.
+parallel_calibration = [cores, ] if config.ostrich_mpi else []
+
 calibration = ComplexOutput('calibration', 'Ostrich calibration output',
                             abstract="Output file from Ostrich calibration run.",
                             supported_formats=[FORMATS.TEXT],
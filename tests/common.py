@@ -31,6 +31,8 @@ TESTDATA['gr4j-cemaneige'] = \
      'evap': TD / 'gr4j_cemaneige' / 'evap.nc'}
 
 TESTDATA['raven-gr4j-cemaneige-nc-ts'] = TD / 'raven-gr4j-cemaneige' / 'Salmon-River-Near-Prince-George_meteo_daily.nc'
+TESTDATA['raven-gr4j-cemaneige-nc-ts-2d'] = \
+    TD / 'raven-gr4j-cemaneige' / 'Salmon-River-Near-Prince-George_meteo_daily_2d.nc'
 TESTDATA['raven-gr4j-cemaneige-nc-rv'] = tuple((TD / 'raven-gr4j-cemaneige').glob('raven-gr4j-salmon.rv?'))
 
 TESTDATA['raven-mohyse-nc-ts'] = TESTDATA['raven-gr4j-cemaneige-nc-ts']
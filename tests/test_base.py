@@ -1,10 +1,12 @@
 from . common import TESTDATA
 import raven
 from raven.models import Raven, Ostrich
+from raven.models.base import _concat_netcdf
 import tempfile
 import numpy as np
 from pathlib import Path
 import pytest
+import xarray as xr
 
 has_singularity = raven.raven_simg.exists()
 
@@ -43,6 +45,20 @@ class TestRaven:
         model.configure(rvs)
         model(ts)
 
+    def test_concat_netcdf(self, tmpdir):
+        files = sorted((TESTDATA['simfile_single'].parent).glob('*_Hydrographs.nc'))
+
+        # Along an existing dimension (basins) and a new one (parameter sets).
+        for dim in ['nbasins', 'params']:
+            outfn = Path(str(tmpdir)) / '{}.nc'.format(dim)
+            _concat_netcdf(files, outfn, dim)
+
+            with xr.open_dataset(outfn) as ds:
+                expected = xr.concat([xr.open_dataset(fn) for fn in files], dim)
+                assert ds.precip.dims == (dim, 'time')
+                for name in ['precip', 'q_sim']:
+                    np.testing.assert_array_equal(ds[name], expected[name].transpose(*ds[name].dims))
+
     @pytest.mark.skipif(not has_singularity, reason="Singularity is not available.")
     def test_singularity(self):
         rvs = TESTDATA['raven-gr4j-cemaneige-nc-rv']
@@ -56,6 +72,11 @@ class TestRaven:
 
 class TestOstrich:
 
+    def test_start_from(self):
+        # The generic Ostrich wrapper does not know the parameters in its templates.
+        with pytest.raises(TypeError):
+            Ostrich().start_from([1., 2.])
+
     def test_gr4j_with_no_tags(self):
         ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
         ost = TESTDATA['ostrich-gr4j-cemaneige-rv']
@@ -0,0 +1,49 @@
+from raven.models.calibration import read_trajectory, best_so_far, TrajectoryReader, EarlyStopping
+import numpy as np
+import time
+
+
+def test_read_trajectory(tmpdir):
+    fn = tmpdir.join('OstModel0.txt')
+    fn.write("Run   obj.function   par_x1   par_x2\n"
+             "0   -1.0E-01   1.0   2.0\n"
+             "1   -3.0E-01   1.5   2.5\n"
+             "2   -2.0E-01   1.2\n")
+
+    names, values = read_trajectory(fn)
+    assert names == ['Run', 'obj.function', 'par_x1', 'par_x2']
+
+    # The last row is still being written.
+    assert values.shape == (2, 4)
+    np.testing.assert_array_equal(best_so_far([-.1, -.3, -.2]), [-.1, -.3, -.3])
+
+
+def test_trajectory_reader(tmpdir):
+    fn = tmpdir.join('OstModel0.txt')
+    reader = TrajectoryReader(fn)
+    assert reader.read() == []
+
+    fn.write("Run   obj.function   par_x1\n"
+             "0   -1.0E-01   1.0\n"
+             "1   -3.0E-01   1.")
+    assert reader.read() == [(0, -.1, [1.])]
+
+    fn.write("5\n", mode='a')
+    assert reader.read() == [(1, -.3, [1.5])]
+    assert reader.read() == []
+
+
+def test_early_stopping():
+    criterion = EarlyStopping(epsilon=.01, patience=2)
+    for i, obj in enumerate([-.1, -.3, -.305]):
+        criterion.update(i, obj, [])
+        assert not criterion()
+
+    criterion.update(3, -.309, [])
+    assert criterion()
+    assert 'No improvement' in criterion.reason
+
+    criterion = EarlyStopping(timeout=.1)
+    assert not criterion()
+    time.sleep(.2)
+    assert criterion()
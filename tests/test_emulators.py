@@ -1,11 +1,14 @@
 import pytest
 from . common import TESTDATA, _convert_2d
 from raven.models import Raven, GR4JCN, HMETS, MOHYSE, HBVEC, GR4JCN_OST, HMETS_OST, MOHYSE_OST, HBVEC_OST
-from raven.models import RavenMultiModel
+from raven.models import RavenMultiModel, ResultCache, StateStore, EarlyStopping, PoolExecutor
+from raven.models.calibration import read_trajectory
 import tempfile
 import datetime as dt
 import numpy as np
 import os
+import xarray as xr
+from pathlib import Path
 
 
 @pytest.fixture
@@ -49,6 +52,173 @@ class TestGR4JCN:
         # Check attributes
         assert model.hydrograph.attrs['model_id'] == 'gr4jcn'
 
+    def test_outputs_cached(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        with GR4JCN() as model:
+            model(ts,
+                  start_date=dt.datetime(2000, 1, 1),
+                  end_date=dt.datetime(2002, 1, 1),
+                  area=4250.6,
+                  elevation=843.0,
+                  latitude=54.4848,
+                  longitude=-123.3659,
+                  params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+            # The output file is opened only once.
+            assert model.hydrograph is model.hydrograph
+
+        assert model._datasets == {}
+
+    def test_timings(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        recorded = []
+        model.timing_callback = lambda name, value: recorded.append(name)
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        for phase in ['setup', 'assign_files', 'derived_parameters', 'dump_rv', 'link', 'exec', 'parse_results',
+                      'merge']:
+            assert model.timings[phase] >= 0
+            assert phase in recorded
+
+        assert model.timings['bytes_written'] > 0
+        assert model.timings['child_cpu'] > 0
+
+    def test_reuse_workspace(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        model.reuse_workspace = True
+        kwargs = dict(start_date=dt.datetime(2000, 1, 1),
+                      end_date=dt.datetime(2002, 1, 1),
+                      area=4250.6,
+                      elevation=843.0,
+                      latitude=54.4848,
+                      longitude=-123.3659)
+
+        model(ts, params=[(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+                          (0.528, -3.4, 407.3, 1.07, 17, .95)], **kwargs)
+        rvh = model.exec_path / 'model' / 'p00' / 'raven-gr4j-cemaneige.rvh'
+        mtime = rvh.stat().st_mtime_ns
+
+        model(ts, params=(0.5, -3.4, 407.3, 1.07, 17, .95), overwrite=True, **kwargs)
+
+        # Unchanged configuration files are not rewritten and extra run directories are removed.
+        assert rvh.stat().st_mtime_ns == mtime
+        assert not (model.exec_path / 'model' / 'p01').exists()
+        assert len(model.ind_outputs['hydrograph']) == 1
+
+    def test_reuse_workspace_fresh(self, input2d):
+        ts = input2d
+        kwargs = dict(start_date=dt.datetime(2000, 1, 1),
+                      end_date=dt.datetime(2002, 1, 1),
+                      area=4250.6,
+                      elevation=843.0,
+                      latitude=54.4848,
+                      longitude=-123.3659,
+                      params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+                      nc_index=[0, 0])
+
+        for batch in (False, True):
+            model = GR4JCN()
+            model.reuse_workspace = True
+            model.batch_basins = batch
+
+            # The first call creates the workspace, the second one reuses it.
+            model(ts, **kwargs)
+            model(ts, overwrite=True, **kwargs)
+            assert len(model.diagnostics) == 2
+
+    def test_scratch(self, tmpdir):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        model.scratch = str(tmpdir)
+        model.persist_outputs = ('hydrograph', )
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        assert model.final_path in model.outputs['hydrograph'].parents
+        assert 'storage' not in model.outputs
+        assert model.q_sim.max() > 0
+
+        # The scratch directory is freed once the outputs are persisted.
+        assert not model.exec_path.exists()
+
+    def test_select_outputs(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+              outputs=['hydrograph', 'diagnostics'])
+
+        assert set(model.outputs.keys()) == {'hydrograph', 'diagnostics'}
+        assert not list(model.exec_path.rglob('*WatershedStorage.nc'))
+
+        with pytest.raises(ValueError):
+            model.select_outputs(['q_sim'])
+
+    def test_log(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        # The executable output is written to a log file, whose end is included in error reports.
+        log = model.model_path / 'stdout.log'
+        assert log.exists()
+
+        log.write_text("Something went wrong\n")
+        assert "Something went wrong" in model.parse_errors()
+
+    def test_sweep(self, tmpdir):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        low = (0.01, -15.0, 10.0, 0.0, 1.0, 0.0)
+        high = (2.5, 10.0, 700.0, 7.0, 30.0, 1.0)
+
+        for design, scratch in (('lhs', None), ('sobol', str(tmpdir))):
+            model = GR4JCN()
+            model.scratch = scratch
+            store = model.sweep(ts, design, bounds=(low, high), n=4, seed=1, chunk_size=3,
+                                start_date=dt.datetime(2000, 1, 1),
+                                end_date=dt.datetime(2002, 1, 1),
+                                area=4250.6,
+                                elevation=843.0,
+                                latitude=54.4848,
+                                longitude=-123.3659)
+
+            with xr.open_dataset(store) as ds:
+                assert ds.q_sim.dims[0] == 'member'
+                assert len(ds.member) == 4
+                assert list(ds.param.values) == list(GR4JCN.params._fields)
+                assert ds.DIAG_NASH_SUTCLIFFE.notnull().all()
+
+            # Run directories are cleaned up.
+            assert not model.exec_path.exists()
+
     def test_tags(self):
         model = GR4JCN(tempfile.mkdtemp())
 
@@ -89,6 +259,32 @@ class TestGR4JCN:
         d = model.diagnostics
         np.testing.assert_almost_equal(d['DIAG_NASH_SUTCLIFFE'], -0.0371048, 2)
 
+    def test_arun(self):
+        import asyncio
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        models = [GR4JCN(), GR4JCN()]
+        kwds = dict(start_date=dt.datetime(2000, 1, 1),
+                    end_date=dt.datetime(2002, 1, 1),
+                    area=4250.6,
+                    elevation=843.0,
+                    latitude=54.4848,
+                    longitude=-123.3659,
+                    params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        async def main():
+            await asyncio.gather(*(m.arun(ts, **kwds) for m in models))
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(main())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        for m in models:
+            np.testing.assert_almost_equal(m.diagnostics['DIAG_NASH_SUTCLIFFE'], -0.0371048, 2)
+
     def test_overwrite(self):
         ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
         model = GR4JCN()
@@ -116,6 +312,52 @@ class TestGR4JCN:
         d = model.diagnostics
         np.testing.assert_almost_equal(d['DIAG_NASH_SUTCLIFFE'], -0.0269642, 2)
 
+    def test_cache(self, tmpdir):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        kwds = dict(start_date=dt.datetime(2000, 1, 1),
+                    end_date=dt.datetime(2002, 1, 1),
+                    area=4250.6,
+                    elevation=843.0,
+                    latitude=54.4848,
+                    longitude=-123.3659,
+                    params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        model = GR4JCN()
+        model.cache = ResultCache(tmpdir)
+        model(ts, **kwds)
+        assert model.run_order == [0]
+        assert len(model.cache.entries()) == 1
+
+        # Identical run: outputs are restored from the cache and Raven is not launched.
+        model(ts, overwrite=True, **kwds)
+        assert model.run_order == []
+        np.testing.assert_almost_equal(model.diagnostics['DIAG_NASH_SUTCLIFFE'], -0.0371048, 2)
+
+        model.cache.max_size = 0
+        model.cache.evict()
+        assert model.cache.entries() == []
+
+    def test_warm_start(self, tmpdir):
+        import xarray as xr
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        kwds = dict(area=4250.6,
+                    elevation=843.0,
+                    latitude=54.4848,
+                    longitude=-123.3659,
+                    params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947))
+
+        model = GR4JCN()
+        model.state_store = StateStore(tmpdir)
+        model(ts, start_date=dt.datetime(2000, 1, 1), end_date=dt.datetime(2001, 1, 1), **kwds)
+
+        # The second simulation restarts from the saved state on the last simulated day.
+        model(ts, end_date=dt.datetime(2001, 1, 11), overwrite=True, **kwds)
+        assert model.rvi.start_date == dt.datetime(2001, 1, 1)
+
+        with xr.open_dataset(model.outputs['history']) as ds:
+            assert ds.indexes['time'][0] == dt.datetime(2000, 1, 1)
+            assert ds.indexes['time'][-1] == dt.datetime(2001, 1, 11)
+
     def test_version(self):
         model = Raven()
         assert model.version == '2.9'
@@ -137,7 +379,34 @@ class TestGR4JCN:
               )
 
         assert len(model.diagnostics) == 2
+        assert Path(model.outputs['hydrograph']).suffix == '.nc'
         assert model.hydrograph.dims['params'] == 2
+        assert sorted(model.run_order) == [0, 1]
+
+        table = model.diagnostics_table
+        assert len(table) == 2
+        assert model.diagnostics_table is table
+        assert table['DIAG_NASH_SUTCLIFFE'][0] == model.diagnostics[0]['DIAG_NASH_SUTCLIFFE']
+        assert (model.final_path / model._diagnostics_table_name).exists()
+
+    def test_parallel_params_max_workers(self):
+        ts = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        model = GR4JCN()
+        model.max_workers = 1
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=[(0.529, -3.396, 407.29, 1.072, 16.9, 0.947), (0.528, -3.4, 407.3, 1.07, 17, .95),
+                      (0.527, -3.4, 407.3, 1.07, 17, .95)]
+              )
+
+        # With a single worker, runs are executed sequentially in the order they were queued.
+        assert model.run_order == [0, 1, 2]
+        assert model.hydrograph.dims['params'] == 3
 
     def test_parallel_basins(self, input2d):
 
@@ -156,11 +425,184 @@ class TestGR4JCN:
               )
 
         assert len(model.diagnostics) == 2
+        assert Path(model.outputs['hydrograph']).suffix == '.nc'
         assert len(model.hydrograph.nbasins) == 2
         np.testing.assert_array_equal(model.hydrograph.basin_name[:], ['basin1', 'basin2'])
 
+    def test_parallel_basins_batched(self, input2d):
+        ts = input2d
+        model = GR4JCN()
+        model.batch_basins = True
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=[0.529, -3.396, 407.29, 1.072, 16.9, 0.947],
+              nc_index=[0, 0],
+              name=['basin1', 'basin2'],
+              )
+
+        # A single Raven process simulates both basins.
+        assert model.run_order == [0]
+        assert len(model.diagnostics) == 2
+        assert len(model.hydrograph.nbasins) == 2
+        np.testing.assert_array_equal(model.hydrograph.basin_name[:], ['basin1', 'basin2'])
+
+    def test_forcing_cache(self, input2d, tmpdir):
+        ts = input2d
+        model = GR4JCN()
+        model.forcing_cache = tmpdir / 'forcing'
+        kwds = dict(start_date=dt.datetime(2000, 1, 1),
+                    end_date=dt.datetime(2002, 1, 1),
+                    area=4250.6,
+                    elevation=843.0,
+                    latitude=54.4848,
+                    longitude=-123.3659,
+                    params=[0.529, -3.396, 407.29, 1.072, 16.9, 0.947],
+                    nc_index=0)
+        model(ts, **kwds)
+
+        # The forcing file is subset once, and Raven reads the subset.
+        assert len(model.forcing_cache.listdir('*.nc')) == 1
+        rvt = (model.exec_path / 'model' / 'p00' / 'raven-gr4j-cemaneige.rvt').read_text()
+        assert str(model.forcing_cache) in rvt
+        assert str(model.forcing_cache) not in str(model.rvt.pr)
+
+        model(ts, overwrite=True, **kwds)
+        assert len(model.forcing_cache.listdir('*.nc')) == 1
+        np.testing.assert_almost_equal(model.diagnostics['DIAG_NASH_SUTCLIFFE'], -0.0371048, 2)
+
 
 class TestGR4JCN_OST:
+    def test_multistart(self):
+        ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
+        model = GR4JCN_OST()
+        params, ds = model.multistart(ts,
+                                      seeds=[0, 1],
+                                      start_date=dt.datetime(1954, 1, 1),
+                                      duration=208,
+                                      area=4250.6,
+                                      elevation=843.0,
+                                      latitude=54.4848,
+                                      longitude=-123.3659,
+                                      params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.053),
+                                      lowerBounds=(0.01, -15.0, 10.0, 0.0, 1.0, 0.0),
+                                      upperBounds=(2.5, 10.0, 700.0, 7.0, 30.0, 1.0),
+                                      algorithm='DDS',
+                                      max_iterations=10,
+                                      )
+
+        assert ds.obj.shape == (2, )
+        assert ds.params.shape == (2, 6)
+        assert ds.trajectory.shape[1] == 10
+        assert ds.spread.shape == (6, )
+
+        # Outputs are those of the best start.
+        best = int(ds.obj.argmin())
+        np.testing.assert_almost_equal(ds.params[best], params)
+        np.testing.assert_almost_equal(model.calibrated_params, params)
+        assert (model.workdir / 'start{}'.format(best) / 'final') in Path(model.outputs['hydrograph']).parents
+
+    def test_progress(self):
+        ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
+        model = GR4JCN_OST()
+        evaluations = list(model.progress(ts,
+                                          start_date=dt.datetime(1954, 1, 1),
+                                          duration=208,
+                                          area=4250.6,
+                                          elevation=843.0,
+                                          latitude=54.4848,
+                                          longitude=-123.3659,
+                                          params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.053),
+                                          lowerBounds=(0.01, -15.0, 10.0, 0.0, 1.0, 0.0),
+                                          upperBounds=(2.5, 10.0, 700.0, 7.0, 30.0, 1.0),
+                                          algorithm='DDS',
+                                          random_seed=0,
+                                          max_iterations=10,
+                                          ))
+
+        assert len(evaluations) == 10
+        iteration, obj, params = evaluations[-1]
+        assert len(params) == 6
+        np.testing.assert_almost_equal(min(e[1] for e in evaluations), -model.diagnostics['DIAG_NASH_SUTCLIFFE'], 4)
+        assert model.progress_callback is None
+
+    def test_early_stopping(self):
+        ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
+        model = GR4JCN_OST()
+        model.early_stopping = EarlyStopping(epsilon=1., patience=1)
+        model(ts,
+              start_date=dt.datetime(1954, 1, 1),
+              duration=208,
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.053),
+              lowerBounds=(0.01, -15.0, 10.0, 0.0, 1.0, 0.0),
+              upperBounds=(2.5, 10.0, 700.0, 7.0, 30.0, 1.0),
+              algorithm='DDS',
+              random_seed=0,
+              max_iterations=5000,
+              )
+
+        # The calibration is stopped long before its budget, and still returns the best parameters.
+        assert model.early_stopping.reason is not None
+        names, values = read_trajectory(model.outputs['params_seq'])
+        assert len(values) < 5000
+        assert len(model.calibrated_params) == 6
+        assert 'hydrograph' in model.outputs
+
+        # The saved outputs are those of the best evaluation.
+        best = values[np.argmin(values[:, 1])]
+        rvp = (model.final_path / 'raven-gr4j-cemaneige.rvp').read_text()
+        assert repr(float(best[names.index('par_x1')])) in rvp
+        np.testing.assert_almost_equal(model.diagnostics['DIAG_NASH_SUTCLIFFE'], -best[1], 4)
+
+    def test_early_stopping_executor(self):
+        ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
+        model = GR4JCN_OST()
+        model.early_stopping = EarlyStopping(epsilon=1., patience=1)
+        model.executor = PoolExecutor()
+
+        # The executor cannot terminate Ostrich once the criterion is met.
+        with pytest.raises(ValueError):
+            model(ts,
+                  start_date=dt.datetime(1954, 1, 1),
+                  duration=208,
+                  area=4250.6,
+                  elevation=843.0,
+                  latitude=54.4848,
+                  longitude=-123.3659,
+                  params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.053),
+                  lowerBounds=(0.01, -15.0, 10.0, 0.0, 1.0, 0.0),
+                  upperBounds=(2.5, 10.0, 700.0, 7.0, 30.0, 1.0),
+                  algorithm='DDS',
+                  random_seed=0,
+                  max_iterations=5000,
+                  )
+        model.executor.shutdown()
+
+    def test_parallel_cmd(self):
+        model = GR4JCN_OST()
+        assert model.bash_cmd[0] == model.ostrich_cmd
+
+        algorithm = model.txt.algorithm
+        model.txt.cores = 4
+        try:
+            # Only ParallelDDS is launched with MPI.
+            with pytest.raises(ValueError):
+                model.bash_cmd
+
+            model.txt.algorithm = 'ParallelDDS'
+            assert model.bash_cmd[:4] == ['mpirun', '-n', '4', model.ostrich_cmd]
+        finally:
+            model.txt.algorithm = algorithm
+            model.txt.cores = 1
+
     def test_simple(self):
         ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
         model = GR4JCN_OST()
@@ -222,6 +664,33 @@ class TestGR4JCN_OST:
               )
         np.testing.assert_almost_equal(gr4j.diagnostics['DIAG_NASH_SUTCLIFFE'], d['DIAG_NASH_SUTCLIFFE'])
 
+    def test_start_from(self):
+        ts = TESTDATA['ostrich-gr4j-cemaneige-nc-ts']
+        model = GR4JCN_OST()
+
+        # Start from the parameters found by a previous calibration (see test_simple).
+        model.start_from([2.423961, 3.758972, 204.3856, 5.866946, 16.60408, 0.3728098])
+        try:
+            assert model.txt.initial_values == 'UseInitialParamValues'
+            model(ts,
+                  start_date=dt.datetime(1954, 1, 1),
+                  duration=208,
+                  area=4250.6,
+                  elevation=843.0,
+                  latitude=54.4848,
+                  longitude=-123.3659,
+                  lowerBounds=(0.01, -15.0, 10.0, 0.0, 1.0, 0.0),
+                  upperBounds=(2.5, 10.0, 700.0, 7.0, 30.0, 1.0),
+                  algorithm='DDS',
+                  random_seed=0,
+                  max_iterations=2,
+                  )
+        finally:
+            model.start_from(None)
+
+        assert model.txt.initial_values == 'UseRandomParamValues'
+        assert model.diagnostics['DIAG_NASH_SUTCLIFFE'] >= 0.486
+
 
 class TestHMETS:
 
@@ -332,6 +801,19 @@ class TestHMETS_OST:
               )
         np.testing.assert_almost_equal(hmets.diagnostics['DIAG_NASH_SUTCLIFFE'], d['DIAG_NASH_SUTCLIFFE'], 4)
 
+    def test_raven2ost(self):
+        model = HMETS_OST()
+        params = model.params(9.5019, 0.2774, 6.3942, 0.6884, 1.2875, 5.4134, 2.3641, 0.0973, 0.0464, 0.1998, 0.0222,
+                              -1.0919, 2.6851, 0.3740, 1.0000, 0.4739, 0.0114, 0.0243, 0.0069, 310.7211, 916.1947)
+        ost = model.raven2ost(params)
+
+        names = ['par_x{:02}'.format(i) for i in range(1, 22)]
+        ops = dict(zip(names, ost))
+        ops['par_sum_x05_x06'] = ost[4] + ost[5]
+        ops['par_sum_x09_x10'] = ost[8] + ost[9]
+        np.testing.assert_almost_equal(model.ost2raven(ops), params)
+
+
 class TestMOHYSE:
 
     def test_simple(self):
@@ -448,6 +930,34 @@ class TestHBVEC:
         d = model.diagnostics
         np.testing.assert_almost_equal(d['DIAG_NASH_SUTCLIFFE'], -0.075407, 4)
 
+    def test_forcing_cache(self, tmpdir):
+        ts = TESTDATA['raven-hbv-ec-nc-ts']
+        params = (0.05984519, 4.072232, 2.001574, 0.03473693, 0.09985144, 0.506052, 3.438486, 38.32455, 0.4606565,
+                  0.06303738, 2.277781, 4.873686, 0.5718813, 0.04505643, 0.877607, 18.94145, 2.036937, 0.4452843,
+                  0.6771759, 1.141608, 1.024278)
+
+        # Monthly averages are computed from the complete forcing files, even if the subset holds less than a year.
+        rvts, q_sims = [], []
+        for cache in (None, tmpdir / 'forcing'):
+            model = HBVEC()
+            model.forcing_cache = cache
+            model(ts,
+                  start_date=dt.datetime(2000, 1, 1),
+                  end_date=dt.datetime(2000, 7, 1),
+                  area=4250.6,
+                  elevation=843.0,
+                  latitude=54.4848,
+                  longitude=-123.3659,
+                  params=params,
+                  )
+
+            rvt = (model.exec_path / 'model' / 'p00' / 'raven-hbv-ec.rvt').read_text()
+            rvts.append([line for line in rvt.splitlines() if line.startswith(':MonthlyAve')])
+            q_sims.append(model.q_sim.values)
+
+        assert rvts[0] == rvts[1]
+        np.testing.assert_array_equal(q_sims[0], q_sims[1])
+
 
 class TestHBVEC_OST():
     def test_simple(self):
@@ -0,0 +1,170 @@
+import tarfile
+import threading
+import time
+
+import pytest
+
+from raven.models import LocalExecutor, PoolExecutor, QueueExecutor, QueueWorker
+
+cmd = ['sh', '-c', 'echo simulated > output/result.txt && echo done']
+
+
+def setup_run(tmpdir):
+    cwd = tmpdir.mkdir('model')
+    cwd.mkdir('output')
+    cwd.join('input.txt').write('forcing')
+    return cwd
+
+
+class TestExecutors:
+
+    def test_local(self, tmpdir):
+        cwd = setup_run(tmpdir)
+        proc = LocalExecutor()(cmd, str(cwd), 'stdout.log')
+
+        assert proc.returncode == 0
+        assert cwd.join('output', 'result.txt').read() == 'simulated\n'
+        assert cwd.join('stdout.log').read() == 'done\n'
+
+    def test_local_usage(self, tmpdir):
+        executor = LocalExecutor()
+        busy = ['python', '-c', 'import time\nt = time.process_time()\nwhile time.process_time() - t < .5: pass']
+        idle = ['sleep', '1']
+        procs = {}
+
+        def run(name, cmd):
+            procs[name] = executor(cmd, str(tmpdir), name + '.log')
+
+        threads = [threading.Thread(target=run, args=args) for args in (('busy', busy), ('idle', idle))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Each run only reports the resources used by its own process.
+        cpu = {name: proc.rusage.ru_utime + proc.rusage.ru_stime for (name, proc) in procs.items()}
+        assert cpu['busy'] >= .5
+        assert cpu['idle'] < .1
+
+    def test_local_terminate(self, tmpdir):
+        executor = LocalExecutor()
+        # The run launches a process of its own, as Ostrich launches Raven.
+        args = (['sh', '-c', '(sleep 1 && echo late > late.txt) & wait'], str(tmpdir), 'stdout.log')
+        thread = threading.Thread(target=executor, args=args)
+        thread.start()
+        time.sleep(.3)
+        executor.terminate()
+        thread.join(timeout=5)
+
+        # The executor returns once the processes launched by the run have also been terminated.
+        assert not thread.is_alive()
+        time.sleep(1.5)
+        assert not tmpdir.join('late.txt').exists()
+
+    def test_local_acall(self, tmpdir):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = LocalExecutor()
+        cmds = [['sh', '-c', 'sleep 1 && echo {}'.format(i)] for i in range(4)]
+
+        async def main():
+            return await asyncio.gather(*(executor.acall(c, str(tmpdir), '{}.log'.format(i))
+                                          for (i, c) in enumerate(cmds)))
+
+        # Runs do not hold a thread of the default executor while they execute.
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        try:
+            start = time.time()
+            procs = loop.run_until_complete(main())
+            assert time.time() - start < 2 * len(cmds) / 3
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        assert [p.returncode for p in procs] == [0, ] * len(cmds)
+        assert tmpdir.join('3.log').read() == '3\n'
+
+    def test_local_acall_timeout(self, tmpdir):
+        import asyncio
+
+        executor = LocalExecutor()
+        cmd = ['sh', '-c', '(sleep 1 && echo late > late.txt) & wait']
+
+        # Runs timing out are terminated with the processes they launched.
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                loop.run_until_complete(asyncio.wait_for(executor.acall(cmd, str(tmpdir), 'stdout.log'), .3))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        time.sleep(1.5)
+        assert not tmpdir.join('late.txt').exists()
+
+    def test_pool(self, tmpdir):
+        cwd = setup_run(tmpdir)
+        executor = PoolExecutor(max_workers=2)
+        proc = executor(cmd, str(cwd), 'stdout.log')
+        executor.shutdown()
+
+        assert proc.returncode == 0
+        assert cwd.join('output', 'result.txt').read() == 'simulated\n'
+
+    def test_queue(self, tmpdir):
+        cwd = setup_run(tmpdir)
+        broker = tmpdir.mkdir('broker')
+
+        worker = threading.Thread(target=QueueWorker(str(broker), poll=.05).run, kwargs={'max_jobs': 1})
+        worker.start()
+        proc = QueueExecutor(str(broker), poll=.05, timeout=60)(cmd, str(cwd), 'stdout.log')
+        worker.join()
+
+        # Files created by the worker are copied back in the model directory.
+        assert proc.returncode == 0
+        assert cwd.join('output', 'result.txt').read() == 'simulated\n'
+        assert cwd.join('stdout.log').read() == 'done\n'
+        assert not broker.join('results').listdir()
+
+    def test_queue_links(self, tmpdir):
+        cwd = setup_run(tmpdir)
+        tmpdir.join('forcing.nc').write('shared forcing')
+        cwd.join('forcing.nc').mksymlinkto(tmpdir.join('forcing.nc'))
+        broker = tmpdir.mkdir('broker')
+
+        executor = QueueExecutor(str(broker), poll=.05, timeout=60)
+        worker = QueueWorker(str(broker), poll=.05)
+        args = (['sh', '-c', 'cat forcing.nc > output/result.txt'], str(cwd), 'stdout.log')
+        thread = threading.Thread(target=executor, args=args)
+        thread.start()
+        while not broker.join('jobs').listdir('*.json'):
+            time.sleep(.05)
+
+        # Linked files are not shipped, and temporary files are not queued.
+        with tarfile.open(str(broker.join('jobs').listdir('*.tar.gz')[0])) as tar:
+            assert 'forcing.nc' not in tar.getnames()
+            assert 'output' in tar.getnames()
+        assert len(broker.join('jobs').listdir()) == 2
+
+        worker.run(max_jobs=1)
+        thread.join()
+        assert cwd.join('output', 'result.txt').read() == 'shared forcing'
+
+    def test_queue_error(self, tmpdir):
+        cwd = setup_run(tmpdir)
+        broker = tmpdir.mkdir('broker')
+
+        worker = threading.Thread(target=QueueWorker(str(broker), poll=.05).run, kwargs={'max_jobs': 2})
+        worker.start()
+        executor = QueueExecutor(str(broker), poll=.05, timeout=60)
+        proc = executor(['not-an-executable'], str(cwd), 'stdout.log')
+
+        # The error is reported in the log, and the worker keeps running.
+        assert proc.returncode != 0
+        assert 'failed on the worker' in cwd.join('stdout.log').read()
+        assert executor(cmd, str(cwd), 'stdout.log').returncode == 0
+        worker.join()
@@ -0,0 +1,45 @@
+from .common import TESTDATA
+from raven.models.forcing import forcing_metadata, clear_index, subset_forcing
+import datetime as dt
+import xarray as xr
+
+
+class TestForcingMetadata:
+
+    def test_simple(self):
+        fn = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        meta = forcing_metadata(fn)
+
+        assert 'tmax' in meta.variables
+        assert meta.dims['tmax'] == ('time',)
+        assert meta.match(['tasmax', 'tmax']) == 'tmax'
+        assert meta.match(['tasmax']) is None
+        assert meta.start == dt.datetime(1954, 1, 1)
+        assert meta.climatology('tmax').shape == (12,)
+
+    def test_index(self):
+        fn = TESTDATA['raven-gr4j-cemaneige-nc-ts']
+        assert forcing_metadata(fn) is forcing_metadata(fn)
+
+        meta = forcing_metadata(fn)
+        clear_index()
+        assert forcing_metadata(fn) is not meta
+
+
+class TestSubsetForcing:
+
+    def test_simple(self, tmpdir):
+        fn = TESTDATA['raven-gr4j-cemaneige-nc-ts-2d']
+        start, end = dt.datetime(2000, 1, 1), dt.datetime(2001, 1, 1)
+        out = subset_forcing(fn, ['rain', 'tmax'], tmpdir, start, end, index=0)
+
+        with xr.open_dataset(out) as ds:
+            assert set(ds.data_vars) == {'rain', 'tmax'}
+            assert ds.rain.dims == forcing_metadata(fn).dims['rain']
+            assert ds.dims['region'] == 1
+            assert ds.time[0] == dt.datetime(1999, 12, 31)
+            assert ds.time[-1] == dt.datetime(2001, 1, 2)
+
+        # Subsets are reused.
+        assert subset_forcing(fn, ['tmax', 'rain'], tmpdir, start, end, index=0) == out
+        assert subset_forcing(fn, ['rain', 'tmax'], tmpdir, start, end) != out
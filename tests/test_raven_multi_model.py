@@ -1,5 +1,5 @@
 from .common import TESTDATA
-from raven.models import RavenMultiModel
+from raven.models import RavenMultiModel, ResultCache
 import datetime as dt
 
 
@@ -24,3 +24,47 @@ class TestRavenMultiModel:
               )
 
         assert len(model.q_sim) == 2
+        assert list(model.q_sim.model.values) == ['gr4jcn', 'hmets']
+
+    def test_cache(self, tmpdir):
+        ts = TESTDATA['raven-hmets-nc-ts']
+        model = RavenMultiModel(models=['gr4jcn', 'hmets'])
+        model.cache = ResultCache(tmpdir)
+        kwds = dict(start_date=dt.datetime(2000, 1, 1),
+                    end_date=dt.datetime(2002, 1, 1),
+                    area=4250.6,
+                    elevation=843.0,
+                    latitude=54.4848,
+                    longitude=-123.3659,
+                    gr4jcn=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+                    hmets=(9.5019, 0.2774, 6.3942, 0.6884, 1.2875, 5.4134, 2.3641, 0.0973, 0.0464, 0.1998, 0.0222,
+                           -1.0919, 2.6851, 0.3740, 1.0000, 0.4739, 0.0114, 0.0243, 0.0069, 310.7211, 916.1947))
+
+        model(ts, **kwds)
+        assert len(model.cache.entries()) == 2
+
+        # The runs of both models are restored from the cache.
+        model(ts, overwrite=True, **kwds)
+        assert model.run_order == []
+        assert list(model.q_sim.model.values) == ['gr4jcn', 'hmets']
+
+    def test_forcing_cache(self, tmpdir):
+        ts = TESTDATA['raven-hmets-nc-ts']
+        model = RavenMultiModel(models=['gr4jcn', 'hmets'])
+        model.forcing_cache = str(tmpdir)
+        model(ts,
+              start_date=dt.datetime(2000, 1, 1),
+              end_date=dt.datetime(2002, 1, 1),
+              area=4250.6,
+              elevation=843.0,
+              latitude=54.4848,
+              longitude=-123.3659,
+              gr4jcn=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+              hmets=(9.5019, 0.2774, 6.3942, 0.6884, 1.2875, 5.4134, 2.3641, 0.0973, 0.0464, 0.1998, 0.0222,
+                     -1.0919, 2.6851, 0.3740, 1.0000, 0.4739, 0.0114, 0.0243, 0.0069, 310.7211, 916.1947))
+
+        # Both models read the forcing subsets from the cache.
+        assert tmpdir.listdir()
+        for m in model._models:
+            rvt = next(m.model_path.glob('*.rvt')).read_text()
+            assert str(tmpdir) in rvt
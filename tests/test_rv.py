@@ -40,6 +40,25 @@ class TestRVFile:
         assert isinstance(rvf.tags, list)
         assert 'params.GR4J_X3' in rvf.tags
 
+    def test_cached(self):
+        rvp = list((Path(raven.__file__).parent / 'models' / 'raven-gr4j-cemaneige').glob("*.rvp"))[0]
+        rvf = RVFile.cached(rvp)
+        assert RVFile.cached(rvp) is rvf
+
+        RVFile.clear_cache()
+        assert RVFile.cached(rvp) is not rvf
+
+    def test_render(self):
+        rvp = list((Path(raven.__file__).parent / 'models' / 'raven-gr4j-cemaneige').glob("*.rvp"))[0]
+        rvf = RVFile(rvp)
+        params = namedtuple('p', ['GR4J_X1', 'GR4J_X2', 'GR4J_X3', 'GR4J_X4', 'CEMANEIGE_X1', 'CEMANEIGE_X2'])
+        kwds = dict(params=params(1, 2, 3, 4, 5, 6), one_minus_CEMANEIGE_X2=.5, GR4J_X1_hlf=500)
+
+        assert rvf.fields == {'params', 'one_minus_CEMANEIGE_X2'}
+        assert rvf.render(**kwds) == rvf.content.format(**kwds)
+        assert rvf.signature(kwds) == rvf.signature(dict(kwds, GR4J_X1_hlf=0))
+        assert rvf.signature(kwds) != rvf.signature(dict(kwds, one_minus_CEMANEIGE_X2=0))
+
     def test_fail(self):
         fn = Path(raven.__file__).parent
         with pytest.raises(ValueError):
@@ -82,6 +101,13 @@ class TestRV:
         with pytest.raises(ValueError):
             rvi.evaluation_metrics = 'JIM'
 
+    def test_suppress_output(self):
+        rvi = RVI()
+        assert rvi.suppress_output == ''
+
+        rvi.suppress_output = ['storage', 'solution']
+        assert rvi.suppress_output == ':DontWriteWatershedStorage'
+
     def test_update(self):
         rv = RV(a=None, b=None)
         rv.update({'a': 1, 'b': 2})
@@ -106,6 +132,24 @@ class TestOst:
         o.random_seed = 0
         assert o.random_seed == 'RandomSeed 0'
 
+    def test_initial_values(self):
+        p = namedtuple('p', 'x1, x2')
+        o = Ost(init=p('random', 'random'))
+        assert o.initial_values == 'UseRandomParamValues'
+
+        o.init = p(1., 'random')
+        assert o.initial_values == 'UseInitialParamValues'
+
+    def test_cores(self):
+        o = Ost()
+        assert o.cores == 1
+
+        o.cores = 0
+        assert o.cores > 0
+
+        with pytest.raises(ValueError):
+            o.cores = -1
+
 
 def test_isinstance_namedtuple():
     X = namedtuple('params', 'x1, x2, x3')
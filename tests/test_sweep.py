@@ -0,0 +1,38 @@
+from raven.models.sweep import sample
+import numpy as np
+import pytest
+
+low = (0., 10., -1.)
+high = (1., 20., 1.)
+
+
+def test_grid():
+    params = sample('grid', (low, high), 3)
+    assert params.shape == (27, 3)
+    np.testing.assert_array_equal(np.unique(params[:, 1]), [10., 15., 20.])
+
+
+def test_lhs():
+    params = sample('lhs', (low, high), 8, seed=1)
+    assert params.shape == (8, 3)
+
+    # Each of the 8 intervals along each parameter holds a single member.
+    strata = np.floor((params - low) / np.subtract(high, low) * 8)
+    for i in range(3):
+        np.testing.assert_array_equal(np.sort(strata[:, i]), np.arange(8))
+
+    np.testing.assert_array_equal(sample('lhs', (low, high), 8, seed=1), params)
+
+
+def test_sobol():
+    params = sample('sobol', (low, high), 16, seed=1)
+    assert params.shape == (16, 3)
+    assert ((params >= low) & (params <= high)).all()
+
+    # The first 2 ** k members fill the 2 ** k intervals along each parameter.
+    strata = np.floor((params - low) / np.subtract(high, low) * 16)
+    for i in range(3):
+        np.testing.assert_array_equal(np.sort(strata[:, i]), np.arange(16))
+
+    with pytest.raises(ValueError):
+        sample('sobol', ((0, ) * 41, (1, ) * 41), 16)